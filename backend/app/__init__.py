@@ -3,11 +3,22 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+import atexit
 import logging
 
 from .config import Config
 from .utils.error_handlers import register_error_handlers
 from .utils.database import Database
+from .utils.chat_writer import ChatHistoryWriter
+from .utils.chat_store import create_chat_store
+from .utils.chat_bot import SimpleChatBot
+from .utils.career_utils import configure_recommender
+from .utils.passwords import PasswordHasher
+from .models.user import configure_profile_cache
+from .utils.json_provider import APIJSONProvider
+from .utils.metrics import MongoCommandMetrics, metrics, register_request_metrics
+# Registers the mmap:// rate-limit storage scheme
+from .utils import rate_limit_storage  # noqa: F401
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,10 +31,26 @@ limiter = Limiter(
     default_limits=["100 per minute"]
 )
 
+def _shutdown(app):
+    if app.chat_writer:
+        app.chat_writer.close()
+    if app.database:
+        app.database.close()
+
 def create_app(config_class=Config):
     logger.info("Initializing Flask application...")
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = APIJSONProvider(app)
+    
+    # Request metrics first, so their hooks also see requests the limiter rejects
+    metrics.configure(
+        app.config['METRICS_DIR'],
+        flush_interval=app.config['METRICS_FLUSH_INTERVAL'],
+        enabled=app.config['METRICS_ENABLED']
+    )
+    if app.config['METRICS_ENABLED']:
+        register_request_metrics(app)
     
     # Initialize extensions
     CORS(app, origins=app.config['CORS_ORIGINS'])
@@ -32,7 +59,14 @@ def create_app(config_class=Config):
     
     # Initialize database
     try:
-        app.database = Database(app.config['MONGO_URI'])
+        app.database = Database(
+            app.config['MONGO_URI'],
+            listeners=[MongoCommandMetrics(metrics)] if app.config['METRICS_ENABLED'] else [],
+            maxPoolSize=app.config['MONGO_MAX_POOL_SIZE'],
+            minPoolSize=app.config['MONGO_MIN_POOL_SIZE'],
+            waitQueueTimeoutMS=app.config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+            serverSelectionTimeoutMS=app.config['MONGO_SERVER_SELECTION_TIMEOUT_MS']
+        )
         if app.database.test_connection():
             app.database.init_collections()
             logger.info("Database initialized successfully")
@@ -42,14 +76,60 @@ def create_app(config_class=Config):
         logger.error(f"Database initialization failed: {e}")
         app.database = None
     
+    # Chat history store, written behind the request when enabled
+    app.chat_store = None
+    app.chat_writer = None
+    if app.database:
+        app.chat_store = create_chat_store(
+            app.database,
+            layout=app.config['CHAT_HISTORY_LAYOUT'],
+            bucket_size=app.config['CHAT_BUCKET_SIZE']
+        )
+    if app.chat_store and app.config['CHAT_WRITE_BEHIND']:
+        app.chat_writer = ChatHistoryWriter(
+            app.chat_store,
+            flush_size=app.config['CHAT_FLUSH_SIZE'],
+            flush_interval=app.config['CHAT_FLUSH_INTERVAL'],
+            max_queue=app.config['CHAT_QUEUE_MAX'],
+            enqueue_timeout=app.config['CHAT_ENQUEUE_TIMEOUT']
+        )
+    
+    # Shared state built from this app's config rather than the Config class,
+    # so create_app(config_class) applies throughout
+    configure_recommender(app.config)
+    configure_profile_cache(app.config)
+    app.chat_bot = SimpleChatBot(mode=app.config['CHAT_BOT_MODE'])
+    # Its hashing pool is started lazily, in each worker after the fork
+    app.password_hasher = PasswordHasher(
+        rounds=app.config['BCRYPT_ROUNDS'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_concurrent=app.config['AUTH_MAX_CONCURRENT'],
+        queue_timeout=app.config['AUTH_QUEUE_TIMEOUT'],
+        slot_dir=app.config['AUTH_SLOT_DIR']
+    )
+    
+    # One exit hook, so the writer drains through the still-open client
+    # before it is closed; separate hooks run in reverse registration order
+    atexit.register(_shutdown, app)
+    
+    # Fit the career index once up front instead of on the first request
+    if app.config['CAREER_INDEX_WARMUP']:
+        try:
+            from .utils.career_utils import rebuild_career_index
+            rebuild_career_index()
+        except Exception as e:
+            logger.error(f"Career index build failed: {e}")
+    
     # Register error handlers
     register_error_handlers(app)
     
     # Register blueprints
     from .routes.api import api_bp
     from .routes.auth import auth_bp
+    from .routes.career_data_routes import bp as careers_bp
     app.register_blueprint(api_bp, url_prefix=app.config['API_PREFIX'])
     app.register_blueprint(auth_bp, url_prefix=f"{app.config['API_PREFIX']}/auth")
+    app.register_blueprint(careers_bp, url_prefix=f"{app.config['API_PREFIX']}/careers")
     
     logger.info("Flask application initialization complete")
     return app
@@ -15,6 +15,14 @@ class Config:
     
     # MongoDB Configuration
     MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/pathpilot')
+    # Connection pool per worker process; requests waiting longer than
+    # MONGO_WAIT_QUEUE_TIMEOUT_MS for a connection fail instead of piling up.
+    # Under gevent workers this bounds concurrent Mongo operations per worker;
+    # gunicorn.conf.py then defaults it to worker_connections
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '20'))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '0'))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '2000'))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
     
     # API Configuration
     API_PREFIX = '/api'
@@ -24,11 +32,77 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key-here')
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
     
+    # Password hashing: bcrypt work factor and hashing processes per worker;
+    # at most AUTH_MAX_CONCURRENT hashes run on the host at once, and auth
+    # requests that wait longer than AUTH_QUEUE_TIMEOUT for one get a 503
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    # 0 = hash on the request thread, which stalls every request of a gevent worker
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '1'))
+    AUTH_MAX_CONCURRENT = int(os.getenv('AUTH_MAX_CONCURRENT', '2'))
+    AUTH_QUEUE_TIMEOUT = float(os.getenv('AUTH_QUEUE_TIMEOUT', '0.5'))  # seconds
+    AUTH_SLOT_DIR = os.getenv(
+        'AUTH_SLOT_DIR',
+        os.path.join(os.path.dirname(__file__), '..', 'instance', 'auth_slots')
+    )
+    # Per-worker /auth/me profile cache; other workers see changes after at most the TTL
+    PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', '10000'))
+    PROFILE_CACHE_TTL = int(os.getenv('PROFILE_CACHE_TTL', '30'))  # seconds
+    
+    # Career catalog: survey CSV and the cached index artifact built from it
+    CAREER_DATA_CSV = os.getenv(
+        'CAREER_DATA_CSV',
+        os.path.join(os.path.dirname(__file__), '..', '..', 'career_recommender.csv')
+    )
+    CAREER_INDEX_DIR = os.getenv(
+        'CAREER_INDEX_DIR',
+        os.path.join(os.path.dirname(__file__), '..', 'instance', 'career_index')
+    )
+    # "exact" scores every career; "ivf" probes the closest k-means clusters only
+    CAREER_SIMILARITY_BACKEND = os.getenv('CAREER_SIMILARITY_BACKEND', 'exact')
+    CAREER_IVF_LISTS = int(os.getenv('CAREER_IVF_LISTS', '0'))  # 0 = sqrt(catalog size)
+    CAREER_IVF_PROBE = int(os.getenv('CAREER_IVF_PROBE', '8'))
+    RECOMMENDATION_CACHE_SIZE = int(os.getenv('RECOMMENDATION_CACHE_SIZE', '4096'))
+    RECOMMENDATION_CACHE_TTL = int(os.getenv('RECOMMENDATION_CACHE_TTL', '600'))  # seconds
+    CAREER_BATCH_MAX_PROFILES = int(os.getenv('CAREER_BATCH_MAX_PROFILES', '1000'))
+    CAREER_BATCH_MAX_TOP_N = int(os.getenv('CAREER_BATCH_MAX_TOP_N', '50'))
+    # Load the recommendation stack in create_app (shared copy-on-write when
+    # gunicorn preloads the app) instead of on the first recommendation
+    CAREER_INDEX_WARMUP = os.getenv('CAREER_INDEX_WARMUP', 'True').lower() == 'true'
+    
+    # Chat bot: "keyword" intent matching, or "tfidf" nearest-centroid
+    # classification with career suggestions from the career index
+    CHAT_BOT_MODE = os.getenv('CHAT_BOT_MODE', 'keyword')
+    
+    # Chat history layout: "message" (one document per message) or "bucket"
+    # (per-user, per-conversation documents of up to CHAT_BUCKET_SIZE messages)
+    CHAT_HISTORY_LAYOUT = os.getenv('CHAT_HISTORY_LAYOUT', 'message')
+    CHAT_BUCKET_SIZE = int(os.getenv('CHAT_BUCKET_SIZE', '100'))
+    # Documents fetched per round trip when streaming a history export
+    CHAT_EXPORT_BATCH_SIZE = int(os.getenv('CHAT_EXPORT_BATCH_SIZE', '1000'))
+    
+    # Chat history write-behind: batch inserts from a background thread
+    CHAT_WRITE_BEHIND = os.getenv('CHAT_WRITE_BEHIND', 'True').lower() == 'true'
+    CHAT_FLUSH_SIZE = int(os.getenv('CHAT_FLUSH_SIZE', '100'))
+    CHAT_FLUSH_INTERVAL = float(os.getenv('CHAT_FLUSH_INTERVAL', '0.5'))  # seconds
+    CHAT_QUEUE_MAX = int(os.getenv('CHAT_QUEUE_MAX', '10000'))
+    CHAT_ENQUEUE_TIMEOUT = float(os.getenv('CHAT_ENQUEUE_TIMEOUT', '0.05'))  # seconds
+    
     # Rasa Configuration
     RASA_URL = os.getenv('RASA_URL', 'http://localhost:5005')
     
-    # Rate Limiting
+    # Rate Limiting: "memory://" counts per worker; "mmap:///dev/shm/<name>"
+    # shares counters between the workers of one host, "mongodb://..." across hosts
     RATELIMIT_DEFAULT = "100 per minute"
-    RATELIMIT_STORAGE_URL = "memory://"
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'True').lower() == 'true'  # off for load tests
+    RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', 'memory://')
+    
+    # Request metrics served at /metrics; each worker writes a snapshot to
+    # METRICS_DIR every METRICS_FLUSH_INTERVAL and a scrape merges them all
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_DIR = os.getenv(
+        'METRICS_DIR',
+        os.path.join(os.path.dirname(__file__), '..', 'instance', 'metrics')
+    )
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '1.0'))  # seconds
 
 print("--- FINISHED EXECUTING config.py (DEBUG VERSION V3) ---")
\ No newline at end of file
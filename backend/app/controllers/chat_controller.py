@@ -1,8 +1,4 @@
 from flask import request, jsonify, current_app
-from app.utils.chat_bot import SimpleChatBot
-
-# Initialize the chat bot
-chat_bot = SimpleChatBot()
 
 def process_chat_message():
     """Process a chat message and return a response"""
@@ -36,15 +32,17 @@ def process_chat_message():
         user_id = data.get('user_id', 'anonymous')
         
         # Get a response from the chat bot
-        response = chat_bot.get_response(user_message)
+        response = current_app.chat_bot.get_response(user_message)
         
-        # Save chat history if database is provided
-        if 'db' in current_app.config and current_app.config['db']:
-            chat_bot.save_chat_history(
-                current_app.config['db'], 
+        # Save chat history if a chat store is available
+        chat_store = getattr(current_app, 'chat_store', None)
+        if chat_store:
+            current_app.chat_bot.save_chat_history(
+                chat_store, 
                 user_id, 
                 user_message, 
-                response
+                response,
+                writer=getattr(current_app, 'chat_writer', None)
             )
             
         # Return the response
@@ -65,13 +63,14 @@ def get_chat_history():
         # Get limit from query parameters, default to 10
         limit = int(request.args.get('limit', 10))
         
-        # Check if database is available
-        if 'db' not in current_app.config or not current_app.config['db']:
+        # Check if the chat store is available
+        chat_store = getattr(current_app, 'chat_store', None)
+        if not chat_store:
             return jsonify({'error': 'Database not available'}), 503
             
-        # Get chat history from the database
-        history = chat_bot.get_chat_history(
-            current_app.config['db'], 
+        # Get chat history from the chat store
+        history = current_app.chat_bot.get_chat_history(
+            chat_store, 
             user_id, 
             limit
         )
@@ -1,30 +1,57 @@
 from datetime import datetime
-import bcrypt
+import logging
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from ..config import Config
+from ..utils.cache import TTLCache
+from ..utils.passwords import HasherBusy
+
+logger = logging.getLogger(__name__)
+
+# Fields returned to clients; the password hash never leaves the database
+PROFILE_FIELDS = {"password": 0}
+
+# Session checks hit /auth/me on nearly every page load
+_profile_cache = TTLCache(maxsize=Config.PROFILE_CACHE_SIZE, ttl=Config.PROFILE_CACHE_TTL)
+
+def configure_profile_cache(config):
+    """Size the profile cache from an app's config; called from create_app"""
+    global _profile_cache
+    _profile_cache = TTLCache(maxsize=config['PROFILE_CACHE_SIZE'], ttl=config['PROFILE_CACHE_TTL'])
+
+def get_profile_cache_stats():
+    """Hit/miss counters of the profile cache"""
+    return _profile_cache.stats()
 
 class User:
-    def __init__(self, database):
+    def __init__(self, database, hasher=None):
         self.collection = database.get_collection('users')
+        # The app's PasswordHasher; only needed to create or authenticate users
+        self.hasher = hasher
         
-    def create_user(self, email, password, name):
-        """Create a new user"""
-        # Check if user exists
-        if self.collection.find_one({"email": email}):
-            raise ValueError("Email already exists")
-            
-        # Hash password
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        
-        user = {
+    @staticmethod
+    def new_document(email, hashed_password, name):
+        """Build a user document ready for insertion"""
+        now = datetime.utcnow()
+        return {
             "email": email,
-            "password": hashed,
+            "password": hashed_password,
             "name": name,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": now,
+            "updated_at": now
         }
         
-        result = self.collection.insert_one(user)
+    def create_user(self, email, password, name):
+        """Create a new user"""
+        # Hash password (off the request thread, with the configured cost)
+        hashed = self.hasher.hash(password)
+        user = self.new_document(email, hashed, name)
+        
+        # The unique email index rejects duplicates in the same round trip
+        try:
+            result = self.collection.insert_one(user)
+        except DuplicateKeyError:
+            raise ValueError("Email already exists")
         user['_id'] = result.inserted_id
         return user
         
@@ -34,14 +61,50 @@ class User:
         if not user:
             return None
             
-        if bcrypt.checkpw(password.encode('utf-8'), user['password']):
-            return user
-        return None
+        if not self.hasher.verify(password, user['password']):
+            return None
+        
+        if self.hasher.needs_rehash(user['password']):
+            self._rehash(user, password)
+        return user
+        
+    def _rehash(self, user, password):
+        """Upgrade a stored hash to the configured work factor after a successful login"""
+        try:
+            hashed = self.hasher.hash(password)
+        except HasherBusy:
+            # Try again on a later login rather than failing this one
+            return
+        # Only replace the hash we verified, in case the password changed meanwhile
+        self.collection.update_one(
+            {"_id": user['_id'], "password": user['password']},
+            {"$set": {"password": hashed}}
+        )
+        self.hasher.rehashes += 1
+        logger.info(f"Upgraded password hash for user {user['_id']} to cost {self.hasher.rounds}")
         
     def get_user_by_id(self, user_id):
         """Get user by ID"""
         return self.collection.find_one({"_id": ObjectId(user_id)})
         
+    def get_profile(self, user_id):
+        """
+        Get a user's public profile, read through the profile cache
+        
+        Args:
+            user_id (str): User ID from the access token
+            
+        Returns:
+            dict: Profile without the password hash, or None if the user does not exist
+        """
+        profile = _profile_cache.get(user_id)
+        if profile is None:
+            profile = self.collection.find_one({"_id": ObjectId(user_id)}, PROFILE_FIELDS)
+            if profile is None:
+                return None
+            _profile_cache.set(user_id, profile)
+        return dict(profile)
+        
     def update_user(self, user_id, update_data):
         """Update user data"""
         update_data['updated_at'] = datetime.utcnow()
@@ -49,9 +112,11 @@ class User:
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
+        _profile_cache.pop(str(user_id))
         return result.modified_count > 0
         
     def delete_user(self, user_id):
         """Delete a user"""
         result = self.collection.delete_one({"_id": ObjectId(user_id)})
+        _profile_cache.pop(str(user_id))
         return result.deleted_count > 0 
\ No newline at end of file
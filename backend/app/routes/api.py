@@ -1,16 +1,61 @@
-from flask import Blueprint, request, jsonify, current_app
+import csv
+import io
+import logging
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import pandas as pd
-from app.utils.career_utils import get_career_recommendations
-from app.utils.chat_bot import SimpleChatBot
-from app.utils.error_handlers import ValidationError
+from pymongo.errors import PyMongoError
+from app.utils.career_utils import (
+    get_career_recommendations, get_career_recommendations_batch, get_career_index_stats,
+    get_recommendation_cache_stats
+)
+from app.utils.chat_store import decode_cursor, encode_cursor, serialize_message
+from app.utils.error_handlers import APIError, ServiceUnavailableError, ValidationError
+from app.models.user import get_profile_cache_stats
+from app.utils.metrics import metrics
+from app.utils.sse import SSE_HEADERS, chat_event_stream
+from app import limiter
+
+logger = logging.getLogger(__name__)
 
 api_bp = Blueprint('api', __name__)
-chat_bot = SimpleChatBot()
+
+MAX_HISTORY_PAGE = 100
+MAX_CONVERSATION_ID_LENGTH = 64
+
+# Rows joined into one chunk of a streamed export
+EXPORT_CHUNK_ROWS = 500
+EXPORT_FIELDS = ['_id', 'conversation_id', 'timestamp', 'user_message', 'bot_response']
 
 @api_bp.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy", "message": "Backend API is running"})
+    return jsonify({
+        "status": "healthy",
+        "message": "Backend API is running",
+        "career_index": get_career_index_stats(),
+        "recommendation_cache": get_recommendation_cache_stats(),
+        "chat_writer": current_app.chat_writer.stats() if current_app.chat_writer else None,
+        "password_hasher": current_app.password_hasher.stats(),
+        "profile_cache": get_profile_cache_stats(),
+        "database_pool": current_app.database.stats() if current_app.database else None
+    })
+
+@api_bp.route('/metrics', methods=['GET'])
+@limiter.exempt
+def prometheus_metrics():
+    # Merged across all gunicorn workers, whichever one serves the scrape
+    if not current_app.config['METRICS_ENABLED']:
+        raise APIError('Metrics are disabled', status_code=404)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def _conversation_id(data):
+    # Part of the bucket key in the bucket layout, so only short strings
+    conversation_id = data.get('conversation_id')
+    if conversation_id is None:
+        return None
+    if not isinstance(conversation_id, str) or len(conversation_id) > MAX_CONVERSATION_ID_LENGTH:
+        raise ValidationError(f'conversation_id must be a string of at most {MAX_CONVERSATION_ID_LENGTH} characters')
+    return conversation_id
 
 @api_bp.route('/chat', methods=['POST'])
 @jwt_required()
@@ -20,38 +65,140 @@ def chat():
     
     if not user_message:
         raise ValidationError('Message is required')
+    conversation_id = _conversation_id(data)
     
     # Get user ID from JWT token
     user_id = get_jwt_identity()
     
     # Get response from chat bot
-    bot_response = chat_bot.get_response(user_message)
+    reply = current_app.chat_bot.reply(user_message)
+    bot_response = reply['response']
     
     # Save chat history
-    if current_app.database:
-        chat_bot.save_chat_history(current_app.database, user_id, user_message, bot_response)
+    if current_app.chat_store:
+        current_app.chat_bot.save_chat_history(
+            current_app.chat_store, user_id, user_message, bot_response,
+            writer=current_app.chat_writer,
+            conversation_id=conversation_id
+        )
     
     return jsonify({
         "response": bot_response,
-        "timestamp": pd.Timestamp.now().isoformat()
+        "intent": reply['intent'],
+        "careers": reply.get('careers', []),
+        "timestamp": datetime.now().isoformat()
     })
 
+@api_bp.route('/chat/stream', methods=['POST'])
+@jwt_required()
+def chat_stream():
+    data = request.get_json()
+    user_message = data.get('message')
+    
+    if not user_message:
+        raise ValidationError('Message is required')
+    conversation_id = _conversation_id(data)
+    
+    user_id = get_jwt_identity()
+    chat_bot = current_app.chat_bot
+    chat_store = current_app.chat_store
+    chat_writer = current_app.chat_writer
+    
+    def save(bot_response):
+        # Runs once the last chunk is out, so persistence never delays the first byte
+        if chat_store:
+            chat_bot.save_chat_history(
+                chat_store, user_id, user_message, bot_response,
+                writer=chat_writer,
+                conversation_id=conversation_id
+            )
+    
+    return Response(
+        stream_with_context(chat_event_stream(chat_bot.stream_reply(user_message), save)),
+        mimetype='text/event-stream',
+        headers=SSE_HEADERS
+    )
+
 @api_bp.route('/chat/history', methods=['GET'])
 @jwt_required()
 def get_chat_history():
     user_id = get_jwt_identity()
     
-    if not current_app.database:
-        return jsonify({"history": []})
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), MAX_HISTORY_PAGE))
+    except ValueError:
+        raise ValidationError('limit must be an integer')
     
-    history = chat_bot.get_chat_history(current_app.database, user_id)
+    before = request.args.get('before')
+    if before:
+        try:
+            before = decode_cursor(before)
+        except ValueError:
+            raise ValidationError('before must be a "<timestamp>,<id>" cursor')
     
-    # Convert ObjectId to string for JSON serialization
-    for record in history:
-        record['_id'] = str(record['_id'])
-        record['timestamp'] = record['timestamp'].isoformat()
+    if not current_app.chat_store:
+        return jsonify({"history": [], "next_cursor": None})
     
-    return jsonify({"history": history})
+    try:
+        history = current_app.chat_bot.get_chat_history(current_app.chat_store, user_id, limit, before=before or None)
+    except PyMongoError as e:
+        logger.error(f"Error getting chat history: {e}")
+        raise ServiceUnavailableError('Chat history is temporarily unavailable')
+    
+    return jsonify({
+        "history": history,
+        # A full page means there may be older messages
+        "next_cursor": encode_cursor(history[-1]) if len(history) == limit else None
+    })
+
+@api_bp.route('/chat/history/export', methods=['GET'])
+@jwt_required()
+# Exports read a user's whole history, so keep them well below the default limit
+@limiter.limit("10 per minute")
+def export_chat_history():
+    user_id = get_jwt_identity()
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        raise ValidationError('format must be "ndjson" or "csv"')
+    
+    if not current_app.chat_store:
+        raise APIError('Chat history is not available', status_code=503)
+    
+    messages = current_app.chat_store.export(user_id, batch_size=current_app.config['CHAT_EXPORT_BATCH_SIZE'])
+    lines = _csv_lines(messages) if export_format == 'csv' else _ndjson_lines(messages, current_app.json.dumps)
+    filename = f"chat-history-{datetime.utcnow():%Y%m%d}.{export_format}"
+    
+    return Response(
+        stream_with_context(_chunked(lines)),
+        mimetype='text/csv' if export_format == 'csv' else 'application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+def _ndjson_lines(messages, dumps):
+    for message in messages:
+        yield dumps(message) + '\n'
+
+def _csv_lines(messages):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for message in messages:
+        writer.writerow(serialize_message(message))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def _chunked(lines):
+    """Join streamed rows so each chunk written to the socket carries many of them"""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= EXPORT_CHUNK_ROWS:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
 
 @api_bp.route('/career-recommendations', methods=['POST'])
 @jwt_required()
@@ -64,4 +211,28 @@ def get_recommendations():
         raise ValidationError('Skills or interests are required')
     
     recommendations = get_career_recommendations(skills, interests)
-    return jsonify({"recommendations": recommendations}) 
\ No newline at end of file
+    return jsonify({"recommendations": recommendations}) 
+
+@api_bp.route('/career-recommendations/batch', methods=['POST'])
+@jwt_required()
+def get_recommendations_batch():
+    data = request.get_json()
+    profiles = data.get('profiles')
+    top_n = data.get('top_n', 3)
+    
+    if not isinstance(profiles, list) or not profiles:
+        raise ValidationError('Profiles must be a non-empty list')
+    if len(profiles) > current_app.config['CAREER_BATCH_MAX_PROFILES']:
+        raise ValidationError(
+            f"At most {current_app.config['CAREER_BATCH_MAX_PROFILES']} profiles per batch"
+        )
+    if not all(isinstance(profile, dict) for profile in profiles):
+        raise ValidationError('Each profile must be an object with skills and interests')
+    # bool is an int subclass; true would otherwise mean top_n=1
+    if not isinstance(top_n, int) or isinstance(top_n, bool) or top_n < 1:
+        raise ValidationError('top_n must be a positive integer')
+    if top_n > current_app.config['CAREER_BATCH_MAX_TOP_N']:
+        raise ValidationError(f"top_n must be at most {current_app.config['CAREER_BATCH_MAX_TOP_N']}")
+    
+    recommendations = get_career_recommendations_batch(profiles, top_n)
+    return jsonify({"recommendations": recommendations})
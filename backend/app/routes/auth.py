@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from ..models.user import User
-from ..utils.error_handlers import ValidationError, AuthenticationError
+from ..utils.error_handlers import ValidationError, AuthenticationError, ServiceUnavailableError
+from ..utils.passwords import HasherBusy
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,7 +17,7 @@ def register():
         raise ValidationError('Missing required fields')
         
     try:
-        user_model = User(current_app.database)
+        user_model = User(current_app.database, current_app.password_hasher)
         user = user_model.create_user(
             email=data['email'],
             password=data['password'],
@@ -34,6 +35,8 @@ def register():
         
     except ValueError as e:
         raise ValidationError(str(e))
+    except HasherBusy as e:
+        raise ServiceUnavailableError(str(e))
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -43,8 +46,11 @@ def login():
     if not all(k in data for k in ('email', 'password')):
         raise ValidationError('Missing email or password')
         
-    user_model = User(current_app.database)
-    user = user_model.authenticate(data['email'], data['password'])
+    user_model = User(current_app.database, current_app.password_hasher)
+    try:
+        user = user_model.authenticate(data['email'], data['password'])
+    except HasherBusy as e:
+        raise ServiceUnavailableError(str(e))
     
     if not user:
         raise AuthenticationError('Invalid email or password')
@@ -69,14 +75,11 @@ def get_user_profile():
             return jsonify({'error': 'Database not available'}), 500
             
         user_model = User(current_app.database)
-        user = user_model.get_user_by_id(current_user_id)
+        user = user_model.get_profile(current_user_id)
         
         if not user:
             logger.warning(f"User not found for ID: {current_user_id}")
             raise AuthenticationError('User not found')
-            
-        # Remove sensitive data
-        user.pop('password', None)
         
         return jsonify({
             'status': 'success',
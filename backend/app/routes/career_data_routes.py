@@ -1,9 +1,58 @@
 # PATHPILOT-MAIN/backend/app/routes/career_data_routes.py
-from flask import Blueprint
+from flask import Blueprint, request, jsonify
+from app import limiter
+from app.utils.career_utils import (
+    get_all_careers, get_career_details, search_careers, suggest_career_titles
+)
+from app.utils.error_handlers import APIError, ValidationError
 
 bp = Blueprint('careers', __name__)
 
-# We will add routes here later
-@bp.route('/')
+MAX_SEARCH_RESULTS = 50
+
+@bp.route('/', methods=['GET'])
 def index():
-    return "Career data blueprint placeholder"
\ No newline at end of file
+    careers = get_all_careers()
+    return jsonify({
+        "count": len(careers),
+        "careers": [career["career_title"] for career in careers]
+    })
+
+@bp.route('/search', methods=['GET'])
+# The search box queries on every keystroke, so allow more than the default limit
+@limiter.limit("600 per minute")
+def search():
+    query = request.args.get('q', '').strip()
+    if not query:
+        raise ValidationError('Query parameter q is required')
+
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), MAX_SEARCH_RESULTS))
+    except ValueError:
+        raise ValidationError('limit must be an integer')
+
+    results = search_careers(query, limit=limit)
+    return jsonify({
+        "query": query,
+        "results": [
+            {
+                "career_title": career["career_title"],
+                "description": career["description"],
+                "skills": career["skills"],
+                "interests": career["interests"],
+                "score": career["search_score"]
+            }
+            for career in results
+        ]
+    })
+
+@bp.route('/<path:career_title>', methods=['GET'])
+def details(career_title):
+    career = get_career_details(career_title)
+    if career is None:
+        raise APIError(
+            'Career not found',
+            status_code=404,
+            payload={"suggestions": suggest_career_titles(career_title)}
+        )
+    return jsonify({"career": career})
@@ -0,0 +1,241 @@
+import json
+import logging
+import mmap
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+from scipy import sparse
+
+from .similarity import ExactBackend
+
+logger = logging.getLogger(__name__)
+
+
+def career_profile_text(career):
+    """Build the text that represents a career in the vector space"""
+    return " ".join(career["skills"] + career["interests"]).lower()
+
+
+def _vectorizer(**options):
+    # scikit-learn takes most of the recommendation stack's import time, so
+    # it is only imported once an index is actually built or loaded
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(stop_words='english', norm='l2', **options)
+
+
+class CareerIndex:
+    """
+    TF-IDF index over a career catalog.
+
+    The vocabulary and the L2-normalized career matrix are fitted once when
+    the index is built, so scoring a user profile only needs one sparse
+    transform and one sparse dot product.
+    """
+
+    def __init__(self, careers):
+        start = time.perf_counter()
+        self.careers = list(careers)
+        self.vectorizer = _vectorizer()
+        self.matrix = self.vectorizer.fit_transform(
+            [career_profile_text(career) for career in self.careers]
+        ).tocsr()
+        self.build_time = time.perf_counter() - start
+        self.built_at = datetime.utcnow()
+        self.source = "fit"
+        self.backend = ExactBackend(self.matrix)
+
+    @classmethod
+    def from_parts(cls, careers, vocabulary, idf, matrix, build_time=0.0, built_at=None):
+        """Rebuild a fitted index from precomputed parts without refitting"""
+        index = cls.__new__(cls)
+        index.careers = careers
+        index.vectorizer = _vectorizer(vocabulary=vocabulary)
+        index.vectorizer.idf_ = idf
+        index.matrix = matrix
+        index.build_time = build_time
+        index.built_at = built_at or datetime.utcnow()
+        index.source = "cache"
+        index.backend = ExactBackend(matrix)
+        return index
+
+    def save(self, directory, fingerprint=None):
+        """
+        Write the fitted index to a directory as a read-only, mmap-able artifact
+
+        The CSR arrays and career records are stored as raw .npy/.bin files so
+        every gunicorn worker can map the same pages instead of holding a copy.
+
+        Args:
+            directory (str): Target directory, created if missing
+            fingerprint (dict): Description of the source data, stored in meta.json
+        """
+        os.makedirs(directory, exist_ok=True)
+        # Drop the old meta.json first so a half-written artifact never looks complete
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        vocabulary = {term: int(col) for term, col in self.vectorizer.vocabulary_.items()}
+        for name in ("data", "indices", "indptr"):
+            _write_npy(os.path.join(directory, f"matrix_{name}.npy"), getattr(self.matrix, name))
+        _write_npy(os.path.join(directory, "idf.npy"), self.vectorizer.idf_)
+        _write_json(os.path.join(directory, "vocabulary.json"), vocabulary)
+        MappedRecords.write(os.path.join(directory, "careers"), self.careers)
+        _write_json(meta_path, {
+            "version": ARTIFACT_VERSION,
+            "fingerprint": fingerprint,
+            "shape": list(self.matrix.shape),
+            "build_seconds": self.build_time,
+            "built_at": self.built_at.isoformat(),
+        })
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Load an index written by save(), memory-mapping the large arrays
+
+        Args:
+            directory (str): Artifact directory
+
+        Returns:
+            CareerIndex: The loaded index
+        """
+        meta = read_meta(directory)
+        with open(os.path.join(directory, "vocabulary.json"), encoding="utf-8") as f:
+            vocabulary = json.load(f)
+        arrays = [
+            np.load(os.path.join(directory, f"matrix_{name}.npy"), mmap_mode="r")
+            for name in ("data", "indices", "indptr")
+        ]
+        matrix = sparse.csr_matrix(tuple(arrays), shape=tuple(meta["shape"]), copy=False)
+        idf = np.load(os.path.join(directory, "idf.npy"), mmap_mode="r")
+        return cls.from_parts(
+            MappedRecords(os.path.join(directory, "careers")), vocabulary, idf, matrix,
+            build_time=meta.get("build_seconds", 0.0),
+            built_at=datetime.fromisoformat(meta["built_at"]) if meta.get("built_at") else None
+        )
+
+    def __len__(self):
+        return len(self.careers)
+
+    def transform(self, profiles):
+        """
+        Vectorize user profiles into the career vector space
+
+        Args:
+            profiles (list): List of profile strings
+
+        Returns:
+            scipy.sparse.csr_matrix: One L2-normalized row per profile
+        """
+        return self.vectorizer.transform(profiles)
+
+    def search(self, profiles, k):
+        """
+        Top-k careers per profile from the configured similarity backend
+
+        Args:
+            profiles (list): List of profile strings
+            k (int): Number of careers per profile
+
+        Returns:
+            list: One (career_indices, scores) tuple per profile, best first
+        """
+        return self.backend.search(self.transform(profiles), k)
+
+    def set_backend(self, backend):
+        """Swap the similarity backend used by search()"""
+        self.backend = backend
+
+    def nbytes(self):
+        """Approximate memory held by the career matrix"""
+        return self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes
+
+    def stats(self):
+        """Size and build time of the index, for monitoring"""
+        return {
+            "careers": len(self.careers),
+            "vocabulary_size": len(self.vectorizer.vocabulary_),
+            "nnz": int(self.matrix.nnz),
+            "matrix_bytes": int(self.nbytes()),
+            "build_seconds": round(self.build_time, 6),
+            "built_at": self.built_at.isoformat(),
+            "source": self.source,
+            "memory_mapped": _is_memory_mapped(self.matrix.data),
+            **self.backend.stats(),
+        }
+
+
+ARTIFACT_VERSION = 2
+
+
+class MappedRecords:
+    """
+    Read-only sequence of JSON records backed by a memory-mapped file.
+
+    Records are stored back to back in `<path>.bin` with their byte offsets
+    in `<path>.offsets.npy`; each access decodes a fresh dict.
+    """
+
+    def __init__(self, path):
+        self.offsets = np.load(f"{path}.offsets.npy", mmap_mode="r")
+        if os.path.getsize(f"{path}.bin"):
+            self.blob = np.memmap(f"{path}.bin", dtype=np.uint8, mode="r")
+        else:
+            self.blob = np.zeros(0, dtype=np.uint8)
+
+    @staticmethod
+    def write(path, records):
+        encoded = [json.dumps(record, separators=(",", ":")).encode("utf-8") for record in records]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        _write_atomic(f"{path}.bin", lambda f: f.write(b"".join(encoded)))
+        _write_npy(f"{path}.offsets.npy", offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("record index out of range")
+        return json.loads(self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes())
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def read_meta(directory):
+    """Read meta.json of an index artifact, or None if there is no complete artifact"""
+    try:
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def _is_memory_mapped(array):
+    # scipy wraps the loaded memmaps in plain ndarray views, so follow .base
+    while array is not None and not isinstance(array, mmap.mmap):
+        array = getattr(array, "base", None)
+    return array is not None
+
+
+def _write_npy(path, array):
+    _write_atomic(path, lambda f: np.save(f, np.ascontiguousarray(array)))
+
+
+def _write_json(path, data):
+    _write_atomic(path, lambda f: f.write(json.dumps(data, separators=(",", ":")).encode("utf-8")))
@@ -0,0 +1,265 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from collections import Counter
+
+from .file_lock import HAS_FLOCK, lock_file, unlock_file
+
+logger = logging.getLogger(__name__)
+
+# Column positions in career_recommender.csv (the header holds full survey questions)
+COL_UG_COURSE = 2
+COL_SPECIALIZATION = 3
+COL_INTERESTS = 4
+COL_SKILLS = 5
+COL_CERTIFICATE_TITLE = 8
+COL_JOB_TITLE = 10
+
+# Answers that mean "no value" rather than a real skill or job title
+EMPTY_VALUES = {"", "na", "n/a", "nil", "no", "none", "nothing", "not applicable", "-"}
+EXCLUDED_TITLES = {"student", "student unemployed", "unemployed", "fresher"}
+
+# Titles reported by a single respondent are mostly noise ("Intern", "FSC")
+MIN_RESPONDENTS = 2
+MAX_SKILLS = 12
+MAX_INTERESTS = 8
+
+_TOKEN_SPLIT = re.compile(r"[;,\n]+")
+_WHITESPACE = re.compile(r"\s+")
+_TITLE_PUNCTUATION = re.compile(r"[^\w]+")
+
+
+def _decode_lines(raw_file):
+    """Decode a binary file line by line, tolerating mixed utf-8/latin-1 exports"""
+    for raw_line in raw_file:
+        try:
+            line = raw_line.decode("utf-8")
+        except UnicodeDecodeError:
+            line = raw_line.decode("latin-1")
+        # Non-breaking spaces, including utf-8 ones that were re-read as latin-1
+        yield line.replace("\u00c2\u00a0", " ").replace("\u00a0", " ")
+
+
+def clean_text(value):
+    """Collapse whitespace and strip a raw survey value"""
+    return _WHITESPACE.sub(" ", value).strip()
+
+
+def normalize_token(value):
+    """
+    Normalize a single skill or interest token
+
+    Args:
+        value (str): Raw token from the survey
+
+    Returns:
+        str: Lower-cased token, or an empty string for "no value" answers
+    """
+    token = clean_text(value).strip(" .:-").lower()
+    return "" if token in EMPTY_VALUES else token
+
+
+def split_tokens(value):
+    """Split a `;`/`,`-separated survey answer into normalized tokens"""
+    tokens = []
+    for part in _TOKEN_SPLIT.split(value):
+        token = normalize_token(part)
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def normalize_title(title):
+    """Fold case, whitespace and punctuation so title variants share a key"""
+    return _WHITESPACE.sub(" ", _TITLE_PUNCTUATION.sub(" ", title.lower())).strip()
+
+
+def iter_survey_rows(path):
+    """
+    Stream career_recommender.csv one normalized row at a time
+
+    Args:
+        path (str): Path to the survey CSV
+
+    Yields:
+        dict: Row with job_title, ug_course, specialization, skills, interests, certification
+    """
+    with open(path, "rb") as raw_file:
+        reader = csv.reader(_decode_lines(raw_file))
+        next(reader, None)  # header
+        for row in reader:
+            if len(row) <= COL_JOB_TITLE:
+                continue
+            yield {
+                "job_title": clean_text(row[COL_JOB_TITLE]),
+                "ug_course": clean_text(row[COL_UG_COURSE]),
+                "specialization": clean_text(row[COL_SPECIALIZATION]),
+                "interests": split_tokens(row[COL_INTERESTS]),
+                "skills": split_tokens(row[COL_SKILLS]),
+                "certification": clean_text(row[COL_CERTIFICATE_TITLE]),
+            }
+
+
+class _CareerAggregate:
+    def __init__(self):
+        self.titles = Counter()
+        self.skills = Counter()
+        self.interests = Counter()
+        self.backgrounds = Counter()
+        self.respondents = 0
+
+    def add(self, row):
+        self.respondents += 1
+        self.titles[row["job_title"]] += 1
+        self.skills.update(row["skills"])
+        self.interests.update(row["interests"])
+        if row["specialization"]:
+            self.backgrounds[f"{row['ug_course']} {row['specialization']}".strip()] += 1
+
+    def to_career(self):
+        title = self.titles.most_common(1)[0][0]
+        if title.islower():
+            title = title.title()
+        description = f"Role reported by {self.respondents} survey respondent(s)"
+        if self.backgrounds:
+            description += f", most often with a {self.backgrounds.most_common(1)[0][0]} background"
+        return {
+            "career_title": title,
+            "skills": [skill for skill, _ in self.skills.most_common(MAX_SKILLS)],
+            "interests": [interest for interest, _ in self.interests.most_common(MAX_INTERESTS)],
+            "description": description,
+            "aliases": sorted(self.titles),
+            "respondents": self.respondents,
+        }
+
+
+def aggregate_careers(rows):
+    """
+    Group survey rows by normalized job title into career profiles
+
+    Args:
+        rows (iterable): Rows from iter_survey_rows()
+
+    Returns:
+        list: Career dicts in the CAREER_DATA format, most reported first
+    """
+    aggregates = {}
+    for row in rows:
+        key = normalize_title(row["job_title"])
+        if not key or key in EMPTY_VALUES or key in EXCLUDED_TITLES:
+            continue
+        if not row["skills"] and not row["interests"]:
+            continue
+        aggregates.setdefault(key, _CareerAggregate()).add(row)
+
+    ordered = sorted(
+        (agg for agg in aggregates.values() if agg.respondents >= MIN_RESPONDENTS),
+        key=lambda agg: -agg.respondents
+    )
+    return [aggregate.to_career() for aggregate in ordered]
+
+
+def load_survey_careers(path):
+    """Build career profiles from the survey CSV"""
+    return aggregate_careers(iter_survey_rows(path))
+
+
+def merge_catalogs(curated, survey):
+    """Combine the curated catalog with survey profiles; curated entries win on title clashes"""
+    seen = {normalize_title(career["career_title"]) for career in curated}
+    merged = list(curated)
+    for career in survey:
+        if normalize_title(career["career_title"]) not in seen:
+            merged.append(career)
+    return merged
+
+
+def _fingerprint(csv_path, curated):
+    from .career_index import ARTIFACT_VERSION
+
+    stat = os.stat(csv_path)
+    return {
+        "csv": os.path.abspath(csv_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "curated": hashlib.sha1(json.dumps(curated, sort_keys=True).encode("utf-8")).hexdigest(),
+        "version": ARTIFACT_VERSION,
+        "limits": [MIN_RESPONDENTS, MAX_SKILLS, MAX_INTERESTS],
+    }
+
+
+class _ArtifactLock:
+    """Inter-process lock so only one gunicorn worker builds the artifact"""
+
+    def __init__(self, directory, exclusive):
+        self.path = os.path.join(directory, ".lock")
+        self.exclusive = exclusive
+        self.file = None
+
+    def __enter__(self):
+        if HAS_FLOCK:
+            self.file = open(self.path, "a")
+            lock_file(self.file, exclusive=self.exclusive)
+        return self
+
+    def __exit__(self, *exc):
+        if self.file is not None:
+            unlock_file(self.file)
+            self.file.close()
+
+
+def load_career_index(csv_path, cache_dir, curated):
+    """
+    Load the career index from the cached artifact, building it from the CSV if stale
+
+    Args:
+        csv_path (str): Path to career_recommender.csv
+        cache_dir (str): Directory holding the index artifact
+        curated (list): Hand-written careers merged ahead of the survey profiles
+
+    Returns:
+        CareerIndex: Index over the merged catalog
+    """
+    # The text helpers above are used by the search indexes on their own, so the
+    # numpy/scipy-backed index is only imported once a catalog is indexed
+    from .career_index import CareerIndex, read_meta
+
+    if not csv_path or not os.path.exists(csv_path):
+        logger.warning(f"Career survey CSV not found at {csv_path}, using the built-in catalog")
+        return CareerIndex(curated)
+
+    fingerprint = _fingerprint(csv_path, curated)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    with _ArtifactLock(cache_dir, exclusive=False):
+        meta = read_meta(cache_dir)
+        if meta and meta.get("fingerprint") == fingerprint:
+            return CareerIndex.load(cache_dir)
+
+    with _ArtifactLock(cache_dir, exclusive=True):
+        # Another worker may have built it while we waited for the lock
+        meta = read_meta(cache_dir)
+        if meta and meta.get("fingerprint") == fingerprint:
+            return CareerIndex.load(cache_dir)
+        logger.info(f"Building career index artifact from {csv_path}")
+        index = CareerIndex(merge_catalogs(curated, load_survey_careers(csv_path)))
+        index.save(cache_dir, fingerprint=fingerprint)
+        # Serve from the mapped files like every other worker instead of a private copy
+        return CareerIndex.load(cache_dir)
+
+
+if __name__ == "__main__":
+    # Prebuild the artifact, e.g. during a Docker build:
+    #   python -m app.utils.career_loader [csv_path] [cache_dir]
+    from ..config import Config
+    from .career_utils import CAREER_DATA
+
+    logging.basicConfig(level=logging.INFO)
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else Config.CAREER_DATA_CSV
+    cache_dir = sys.argv[2] if len(sys.argv) > 2 else Config.CAREER_INDEX_DIR
+    built = load_career_index(csv_path, cache_dir, CAREER_DATA)
+    logger.info(f"Career index ready in {cache_dir}: {built.stats()}")
@@ -0,0 +1,208 @@
+import math
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+from .career_loader import normalize_title
+
+# Field weights for ranking; a title hit counts more than a description hit
+FIELD_WEIGHTS = {
+    "career_title": 3.0,
+    "skills": 2.0,
+    "interests": 1.5,
+    "description": 0.5,
+}
+
+# Whole-token matches outrank prefix completions of the same length
+PREFIX_MATCH_FACTOR = 0.6
+MAX_PREFIX_EXPANSIONS = 64
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def tokenize(text):
+    """Lower-case word tokens, keeping names like c++ and c# intact"""
+    return _TOKEN.findall(text.lower())
+
+
+class CareerSearchIndex:
+    """
+    Inverted index over career titles, skills, interests and descriptions.
+
+    Built once per catalog; queries are tokenized and each token is resolved
+    through the postings table, with prefix expansion over a sorted term list
+    for typeahead. Careers must match every query token and are ranked by the
+    summed, idf-weighted field scores.
+    """
+
+    def __init__(self, careers):
+        self.careers = careers
+        postings = defaultdict(lambda: defaultdict(float))
+        for idx, career in enumerate(careers):
+            for field, weight in FIELD_WEIGHTS.items():
+                value = career.get(field) or ""
+                text = " ".join(value) if isinstance(value, list) else value
+                for term in set(tokenize(text)):
+                    postings[term][idx] = max(postings[term][idx], weight)
+
+        n_careers = max(len(careers), 1)
+        self.postings = {}
+        for term, matches in postings.items():
+            idf = math.log(1 + n_careers / len(matches))
+            self.postings[term] = {idx: weight * idf for idx, weight in matches.items()}
+        self.terms = sorted(self.postings)
+
+    def expand(self, token):
+        """Indexed terms starting with token, the exact term first"""
+        start = bisect_left(self.terms, token)
+        expansions = []
+        for term in self.terms[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            expansions.append(term)
+        return expansions
+
+    def _token_scores(self, token, prefix):
+        scores = dict(self.postings.get(token, {}))
+        if prefix:
+            for term in self.expand(token):
+                if term == token:
+                    continue
+                for idx, weight in self.postings[term].items():
+                    scores[idx] = max(scores.get(idx, 0.0), weight * PREFIX_MATCH_FACTOR)
+        return scores
+
+    def search(self, query, limit=10, prefix=True):
+        """
+        Ranked careers matching every token of the query
+
+        Args:
+            query (str): Free-text query, e.g. "data ana"
+            limit (int): Maximum number of results
+            prefix (bool): Whether tokens also match as prefixes (typeahead)
+
+        Returns:
+            list: (career_index, score) tuples, best first
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        # Start from the most selective token so the candidate set stays small
+        per_token = sorted((self._token_scores(token, prefix) for token in tokens), key=len)
+        totals = per_token[0]
+        for scores in per_token[1:]:
+            totals = {idx: total + scores[idx] for idx, total in totals.items() if idx in scores}
+            if not totals:
+                return []
+
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CareerTitleIndex:
+    """
+    Constant-time career lookup by title or alias, plus "did you mean" suggestions.
+
+    Titles and aliases are folded with normalize_title() (case, whitespace and
+    punctuation) into one dict. Suggestions come from a character-trigram
+    index over the same keys, ranked by Dice similarity.
+    """
+
+    def __init__(self, careers, min_similarity=0.3):
+        self.careers = careers
+        self.min_similarity = min_similarity
+        self.lookup = {}
+        aliases = {}
+        for idx, career in enumerate(careers):
+            self.lookup.setdefault(normalize_title(career["career_title"]), idx)
+            for alias in career.get("aliases") or []:
+                aliases.setdefault(normalize_title(alias), idx)
+        # Canonical titles win over another career's alias
+        for key, idx in aliases.items():
+            self.lookup.setdefault(key, idx)
+        self.lookup.pop("", None)
+
+        self.keys = list(self.lookup)
+        self.key_sizes = []
+        self.grams = defaultdict(list)
+        for key_id, key in enumerate(self.keys):
+            grams = _trigrams(key)
+            self.key_sizes.append(len(grams))
+            for gram in grams:
+                self.grams[gram].append(key_id)
+
+    def get(self, title):
+        """Index of the career with this title or alias, or None"""
+        return self.lookup.get(normalize_title(title))
+
+    def suggest(self, title, limit=5):
+        """
+        Careers whose title or alias is closest to the given title
+
+        Args:
+            title (str): Possibly misspelled title
+            limit (int): Maximum number of suggestions
+
+        Returns:
+            list: (career_index, similarity) tuples, best first, one per career
+        """
+        key = normalize_title(title)
+        if not key:
+            return []
+        grams = _trigrams(key)
+        overlaps = defaultdict(int)
+        for gram in grams:
+            for key_id in self.grams.get(gram, ()):
+                overlaps[key_id] += 1
+
+        best = {}
+        for key_id, overlap in overlaps.items():
+            similarity = 2 * overlap / (len(grams) + self.key_sizes[key_id])
+            idx = self.lookup[self.keys[key_id]]
+            if similarity >= self.min_similarity and similarity > best.get(idx, 0.0):
+                best[idx] = similarity
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+class ProfileTermMatcher:
+    """
+    Finds catalog skills and interests mentioned in free text.
+
+    Every skill and interest in the catalog is compiled into a phrase table;
+    a message is tokenized once and matched longest-phrase-first.
+    """
+
+    def __init__(self, careers):
+        self.phrases = {}
+        self.max_phrase_length = 1
+        for career in careers:
+            for term in list(career.get("skills") or []) + list(career.get("interests") or []):
+                phrase = tuple(tokenize(term))
+                if phrase:
+                    self.phrases.setdefault(phrase, term)
+                    self.max_phrase_length = max(self.max_phrase_length, len(phrase))
+
+    def find(self, text):
+        """Catalog terms mentioned in text, in order of appearance"""
+        tokens = tokenize(text)
+        found = []
+        i = 0
+        while i < len(tokens):
+            step = 1
+            for length in range(min(self.max_phrase_length, len(tokens) - i), 0, -1):
+                term = self.phrases.get(tuple(tokens[i:i + length]))
+                if term is not None:
+                    if term not in found:
+                        found.append(term)
+                    step = length
+                    break
+            i += step
+        return found
@@ -1,7 +1,13 @@
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+import logging
+import threading
+
+from ..config import Config
+from .cache import TTLCache
+from .career_loader import load_career_index, split_tokens
+from .career_search import CareerSearchIndex, CareerTitleIndex, ProfileTermMatcher
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 # Sample career data (in a real application, this would come from a database)
 CAREER_DATA = [
@@ -55,6 +61,131 @@ CAREER_DATA = [
     }
 ]
 
+_career_index = None
+_career_search_index = None
+_career_title_index = None
+_profile_term_matcher = None
+_career_index_lock = threading.Lock()
+_career_index_version = 0
+
+# Settings the index and cache are built with; create_app replaces these
+# defaults with its app's config through configure_recommender
+_INDEX_SETTINGS = (
+    'CAREER_DATA_CSV', 'CAREER_INDEX_DIR', 'CAREER_SIMILARITY_BACKEND', 'CAREER_IVF_LISTS', 'CAREER_IVF_PROBE'
+)
+_CACHE_SETTINGS = ('RECOMMENDATION_CACHE_SIZE', 'RECOMMENDATION_CACHE_TTL')
+_settings = {name: getattr(Config, name) for name in _INDEX_SETTINGS + _CACHE_SETTINGS}
+
+def _new_recommendation_cache():
+    return TTLCache(maxsize=_settings['RECOMMENDATION_CACHE_SIZE'], ttl=_settings['RECOMMENDATION_CACHE_TTL'])
+
+# Recommendations keyed on (index version, canonical profile tokens, top_n)
+_recommendation_cache = _new_recommendation_cache()
+
+def configure_recommender(config):
+    """
+    Use an app's settings for the shared career index and recommendation cache
+    
+    Args:
+        config (dict): Flask app config with the CAREER_* and RECOMMENDATION_CACHE_* settings
+    """
+    global _career_index, _recommendation_cache
+    with _career_index_lock:
+        if any(_settings[name] != config[name] for name in _INDEX_SETTINGS):
+            # Built from other settings; rebuilt with these on next use
+            _career_index = None
+        _settings.update({name: config[name] for name in _INDEX_SETTINGS + _CACHE_SETTINGS})
+        _recommendation_cache = _new_recommendation_cache()
+
+def get_career_index():
+    """
+    Get the shared career index, building it on first use
+    
+    Returns:
+        CareerIndex: Index fitted over the current career catalog
+    """
+    if _career_index is None:
+        with _career_index_lock:
+            if _career_index is None:
+                _set_career_index(_configure_backend(_load_default_index()))
+    return _career_index
+
+def get_career_search_index():
+    """
+    Get the inverted search index built alongside the career index
+    
+    Returns:
+        CareerSearchIndex: Search index over the current catalog
+    """
+    get_career_index()
+    return _career_search_index
+
+def get_recommendation_cache_stats():
+    """
+    Get hit, miss and eviction counters of the recommendation cache
+    
+    Returns:
+        dict: Cache statistics
+    """
+    return _recommendation_cache.stats()
+
+def rebuild_career_index(careers=None):
+    """
+    Refit the career index, e.g. at startup or after the catalog changes
+    
+    Args:
+        careers (list): Career catalog to index, defaults to CAREER_DATA
+            merged with the survey profiles from the configured CSV
+    
+    Returns:
+        CareerIndex: The newly built index
+    """
+    # numpy, scipy and scikit-learn load here rather than when the module is
+    # imported, so workers and CLI commands that never recommend skip them
+    from .career_index import CareerIndex
+    
+    index = _load_default_index() if careers is None else CareerIndex(careers)
+    _configure_backend(index)
+    with _career_index_lock:
+        _set_career_index(index)
+    return index
+
+def _load_default_index():
+    return load_career_index(_settings['CAREER_DATA_CSV'], _settings['CAREER_INDEX_DIR'], CAREER_DATA)
+
+def _configure_backend(index):
+    if _settings['CAREER_SIMILARITY_BACKEND'] != "exact":
+        from .similarity import create_backend
+        index.set_backend(create_backend(
+            _settings['CAREER_SIMILARITY_BACKEND'],
+            index.matrix,
+            n_lists=_settings['CAREER_IVF_LISTS'],
+            n_probe=_settings['CAREER_IVF_PROBE']
+        ))
+    return index
+
+def _set_career_index(index):
+    global _career_index, _career_index_version, _career_search_index, _career_title_index
+    global _profile_term_matcher
+    _career_index_version += 1
+    index.version = _career_index_version
+    _recommendation_cache.clear()
+    _career_search_index = CareerSearchIndex(index.careers)
+    _career_title_index = CareerTitleIndex(index.careers)
+    _profile_term_matcher = ProfileTermMatcher(index.careers)
+    _career_index = index
+    logger.info(f"Career index built: {index.stats()}")
+
+def get_career_index_stats():
+    """
+    Get build time and size of the career index
+    
+    Returns:
+        dict: Index statistics, or None if the index has not been built yet
+    """
+    index = _career_index
+    return index.stats() if index is not None else None
+
 def get_career_recommendations(skills, interests, top_n=3):
     """
     Get career recommendations based on skills and interests
@@ -67,34 +198,73 @@ def get_career_recommendations(skills, interests, top_n=3):
     Returns:
         list: List of recommended careers with scores
     """
-    if not skills and not interests:
+    tokens = _profile_tokens(skills, interests)
+    if not tokens:
         return []
     
-    # Combine skills and interests for analysis
-    user_profile = " ".join(skills + interests).lower()
-    
-    # Create feature vectors for careers
-    career_profiles = []
-    for career in CAREER_DATA:
-        career_profile = " ".join(career["skills"] + career["interests"]).lower()
-        career_profiles.append(career_profile)
-    
-    # Use TF-IDF to vectorize the profiles
-    vectorizer = TfidfVectorizer(stop_words='english')
-    career_vectors = vectorizer.fit_transform(career_profiles)
-    user_vector = vectorizer.transform([user_profile])
+    index = get_career_index()
+    key = (index.version, tokens, top_n)
+    recommendations = _recommendation_cache.get(key)
+    if recommendations is None:
+        # Score against the prebuilt index instead of refitting per request
+        with metrics.timer('pathpilot_recommender_duration_seconds', mode='single'):
+            top_indices, scores = index.search([" ".join(tokens)], top_n)[0]
+        recommendations = _build_recommendations(index, top_indices, scores)
+        _recommendation_cache.set(key, recommendations)
+    return [career.copy() for career in recommendations]
+
+def get_career_recommendations_batch(profiles, top_n=3):
+    """
+    Get career recommendations for many users with one matrix product
     
-    # Calculate similarity scores
-    similarity_scores = cosine_similarity(user_vector, career_vectors).flatten()
+    Args:
+        profiles (list): List of dicts with "skills" and "interests" lists
+        top_n (int): Number of top recommendations per profile
     
-    # Get top recommendations
-    top_indices = similarity_scores.argsort()[-top_n:][::-1]
+    Returns:
+        list: One list of recommended careers per profile, in input order
+    """
+    index = get_career_index()
+    results = [[] for _ in profiles]
+    misses = {}
+    for position, profile in enumerate(profiles):
+        tokens = _profile_tokens(profile.get("skills") or [], profile.get("interests") or [])
+        if not tokens:
+            continue
+        cached = _recommendation_cache.get((index.version, tokens, top_n))
+        if cached is not None:
+            results[position] = [career.copy() for career in cached]
+        else:
+            misses.setdefault(tokens, []).append(position)
     
+    if misses:
+        # Score every uncached profile with one matrix product
+        with metrics.timer('pathpilot_recommender_duration_seconds', mode='batch'):
+            matches = index.search([" ".join(tokens) for tokens in misses], top_n)
+        for (tokens, positions), (top_indices, scores) in zip(misses.items(), matches):
+            recommendations = _build_recommendations(index, top_indices, scores)
+            _recommendation_cache.set((index.version, tokens, top_n), recommendations)
+            for position in positions:
+                results[position] = [career.copy() for career in recommendations]
+    return results
+
+def _profile_tokens(skills, interests):
+    # Canonical profile: "python, sql" and "SQL; Python" give the same sorted token set
+    tokens = set()
+    for values in (skills, interests):
+        # A bare string is one entry, not a list of characters
+        if isinstance(values, str):
+            values = [values]
+        for value in values:
+            tokens.update(split_tokens(str(value)))
+    return tuple(sorted(tokens))
+
+def _build_recommendations(index, top_indices, scores):
     recommendations = []
-    for idx in top_indices:
-        if similarity_scores[idx] > 0:
-            career = CAREER_DATA[idx].copy()
-            career["match_score"] = round(similarity_scores[idx] * 100, 2)
+    for idx, score in zip(top_indices, scores):
+        if score > 0:
+            career = index.careers[idx].copy()
+            career["match_score"] = round(score * 100, 2)
             recommendations.append(career)
     
     return recommendations
@@ -104,15 +274,45 @@ def get_career_details(career_title):
     Get detailed information about a specific career
     
     Args:
-        career_title (str): Title of the career
+        career_title (str): Title or alias of the career; case, whitespace
+            and punctuation are ignored
     
     Returns:
         dict: Career details or None if not found
     """
-    for career in CAREER_DATA:
-        if career["career_title"].lower() == career_title.lower():
-            return career
-    return None
+    get_career_index()
+    idx = _career_title_index.get(career_title)
+    return _career_title_index.careers[idx] if idx is not None else None
+
+def suggest_career_titles(career_title, limit=5):
+    """
+    Get "did you mean" suggestions for a title that did not resolve
+    
+    Args:
+        career_title (str): Possibly misspelled career title
+        limit (int): Maximum number of suggestions
+    
+    Returns:
+        list: Suggested career titles, closest first
+    """
+    get_career_index()
+    return [
+        _career_title_index.careers[idx]["career_title"]
+        for idx, _ in _career_title_index.suggest(career_title, limit)
+    ]
+
+def find_profile_terms(text):
+    """
+    Find catalog skills and interests mentioned in free text, e.g. a chat message
+    
+    Args:
+        text (str): Free text
+    
+    Returns:
+        list: Mentioned skills and interests, in order of appearance
+    """
+    get_career_index()
+    return _profile_term_matcher.find(text)
 
 def get_all_careers():
     """
@@ -121,26 +321,24 @@ def get_all_careers():
     Returns:
         list: List of all careers
     """
-    return CAREER_DATA
+    return get_career_index().careers
 
-def search_careers(query):
+def search_careers(query, limit=10):
     """
-    Search careers by title or description
+    Search careers by title, skills, interests or description
     
     Args:
-        query (str): Search query
+        query (str): Search query; the tokens also match as prefixes for typeahead
+        limit (int): Maximum number of results, None for all
     
     Returns:
-        list: Matching careers
+        list: Matching careers, best match first, each with a search_score
     """
-    query = query.lower()
+    search_index = get_career_search_index()
     matches = []
+    for idx, score in search_index.search(query, limit=limit):
+        career = search_index.careers[idx].copy()
+        career["search_score"] = round(score, 4)
+        matches.append(career)
     
-    for career in CAREER_DATA:
-        if (query in career["career_title"].lower() or 
-            query in career["description"].lower() or
-            any(query in skill.lower() for skill in career["skills"]) or
-            any(query in interest.lower() for interest in career["interests"])):
-            matches.append(career)
-    
-    return matches 
\ No newline at end of file
+    return matches
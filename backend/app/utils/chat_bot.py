@@ -1,8 +1,32 @@
 import random
+import logging
 from datetime import datetime
 
+from .intents import IntentMatcher, DEFAULT_INTENTS_PATH
+from .career_utils import find_profile_terms, get_career_recommendations
+
+logger = logging.getLogger(__name__)
+
+def _join_words(words):
+    words = list(words)
+    if len(words) <= 1:
+        return "".join(words)
+    return f"{', '.join(words[:-1])} and {words[-1]}"
+
 class SimpleChatBot:
-    def __init__(self):
+    MODES = ('keyword', 'tfidf')
+    
+    def __init__(self, mode='keyword', intents_path=DEFAULT_INTENTS_PATH, model_path=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown chat bot mode: {mode}")
+        self.mode = mode
+        self.intent_matcher = IntentMatcher.from_file(intents_path)
+        # The classifier is trained offline; workers only load the serialized model,
+        # and keyword-mode workers never import it (or numpy)
+        self.intent_classifier = None
+        if mode == 'tfidf':
+            from .intent_classifier import IntentClassifier, DEFAULT_MODEL_PATH
+            self.intent_classifier = IntentClassifier.load(model_path or DEFAULT_MODEL_PATH)
         self.responses = {
             'greeting': [
                 "Hello! I'm your career counselor. How can I help you today?",
@@ -38,44 +62,92 @@ class SimpleChatBot:
         
     def get_response(self, message):
         """Get a response based on the user's message"""
-        message = message.lower()
+        return self.reply(message)['response']
+        
+    def reply(self, message):
+        """Get a response along with the intent (and keyword or score) that produced it"""
+        result = self._classify(message)
+        result['response'] = self._base_response(result['intent'])
+        if self.mode == 'tfidf':
+            careers, suggestion = self._career_suggestion(message)
+            if suggestion:
+                result['response'] = f"{result['response']} {suggestion}"
+            result['careers'] = careers
+        return result
         
-        # Simple keyword matching
-        if any(word in message for word in ['hello', 'hi', 'hey', 'greetings']):
-            return random.choice(self.responses['greeting'])
-        elif any(word in message for word in ['career', 'job', 'profession', 'work']):
-            return random.choice(self.responses['career_advice'])
-        elif any(word in message for word in ['skill', 'ability', 'learn', 'develop']):
-            return random.choice(self.responses['skills'])
-        elif any(word in message for word in ['education', 'degree', 'school', 'study']):
-            return random.choice(self.responses['education'])
-        elif any(word in message for word in ['find', 'search', 'apply', 'hiring']):
-            return random.choice(self.responses['job_search'])
-        else:
-            return random.choice(self.responses['default'])
+    def stream_reply(self, message):
+        """
+        Produce a reply as a sequence of events, cheapest first
+        
+        The intent and the canned answer are yielded before career
+        suggestions are computed, so a streaming client can render text while
+        the recommender runs.
+        
+        Args:
+            message (str): Raw user message
             
-    def save_chat_history(self, database, user_id, message, response):
-        """Save chat history to database"""
-        try:
-            chat_collection = database.get_collection('chat_history')
-            chat_record = {
-                'user_id': user_id,
-                'user_message': message,
-                'bot_response': response,
-                'timestamp': datetime.utcnow()
-            }
-            chat_collection.insert_one(chat_record)
-        except Exception as e:
-            print(f"Error saving chat history: {e}")
+        Yields:
+            tuple: (event, data); "intent" once, "message" with a text chunk,
+            then "careers" in tfidf mode
+        """
+        result = self._classify(message)
+        yield 'intent', result
+        yield 'message', {'text': self._base_response(result['intent'])}
+        if self.mode == 'tfidf':
+            careers, suggestion = self._career_suggestion(message)
+            if suggestion:
+                yield 'message', {'text': f" {suggestion}"}
+            yield 'careers', {'careers': careers}
+        
+    def _classify(self, message):
+        if self.mode == 'tfidf':
+            intent, score = self.intent_classifier.classify(message)
+            logger.debug(f"Intent {intent} classified with score {score:.3f}")
+            return {'intent': intent, 'score': round(score, 4)}
+        
+        match = self.intent_matcher.match(message)
+        intent = match.intent if match else 'default'
+        logger.debug(f"Intent {intent} fired on keyword {match.keyword if match else None!r}")
+        return {'intent': intent, 'keyword': match.keyword if match else None}
+        
+    def _base_response(self, intent):
+        return random.choice(self.responses.get(intent, self.responses['default']))
+        
+    def _career_suggestion(self, message):
+        # Turn skills and interests named in the message into concrete suggestions
+        terms = find_profile_terms(message)
+        if not terms:
+            return [], None
+        careers = [career['career_title'] for career in get_career_recommendations(terms, [], top_n=3)]
+        if not careers:
+            return [], None
+        return careers, (
+            f"Based on your interest in {_join_words(terms)}, "
+            f"careers worth exploring include {_join_words(careers)}."
+        )
             
-    def get_chat_history(self, database, user_id, limit=10):
-        """Get chat history for a user"""
+    def save_chat_history(self, store, user_id, message, response, writer=None, conversation_id=None):
+        """Save chat history through the chat store, or its write-behind buffer when given one"""
+        chat_record = {
+            'user_id': user_id,
+            'user_message': message,
+            'bot_response': response,
+            'timestamp': datetime.utcnow()
+        }
+        if conversation_id:
+            chat_record['conversation_id'] = conversation_id
+        if writer is not None:
+            writer.enqueue(chat_record)
+            return
         try:
-            chat_collection = database.get_collection('chat_history')
-            history = chat_collection.find(
-                {'user_id': user_id}
-            ).sort('timestamp', -1).limit(limit)
-            return list(history)
+            store.append(chat_record)
         except Exception as e:
-            print(f"Error getting chat history: {e}")
-            return [] 
\ No newline at end of file
+            logger.error(f"Error saving chat history: {e}")
+            
+    def get_chat_history(self, store, user_id, limit=10, before=None):
+        """
+        Get chat history for a user, optionally older than a (timestamp, _id) cursor
+
+        Store errors propagate, so an outage is not mistaken for an empty history.
+        """
+        return store.recent(user_id, limit, before=before)
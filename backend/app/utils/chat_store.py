@@ -0,0 +1,275 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONVERSATION = 'default'
+
+# Fields returned by history reads; user_id is implied by the query
+MESSAGE_FIELDS = {'user_message': 1, 'bot_response': 1, 'timestamp': 1, 'conversation_id': 1}
+BUCKET_FIELDS = {'conversation_id': 1, 'end': 1, 'messages': 1}
+
+
+def _sort_key(message):
+    return message['timestamp'], message['_id']
+
+
+def encode_cursor(message):
+    """Keyset cursor "<timestamp>,<_id>" pointing just past a message"""
+    return f"{message['timestamp'].isoformat()},{message['_id']}"
+
+
+def decode_cursor(cursor):
+    """
+    Parse a cursor written by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    timestamp, _, message_id = cursor.partition(',')
+    try:
+        timestamp, message_id = datetime.fromisoformat(timestamp), ObjectId(message_id)
+    except (InvalidId, TypeError) as e:
+        raise ValueError(str(e))
+    if timestamp.tzinfo is not None:
+        # Stored timestamps are naive UTC; an offset-aware one cannot be compared with them
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp, message_id
+
+
+def serialize_message(message):
+    """Flat, string-valued copy of a projected history message, e.g. for CSV rows"""
+    return {
+        '_id': str(message['_id']),
+        'user_message': message['user_message'],
+        'bot_response': message['bot_response'],
+        'timestamp': message['timestamp'].isoformat(),
+        'conversation_id': message.get('conversation_id'),
+    }
+
+
+class MessageChatStore:
+    """Chat history with one document per message (the original layout)"""
+
+    layout = 'message'
+
+    def __init__(self, database, collection='chat_history'):
+        self.database = database
+        self.collection_name = collection
+
+    @property
+    def collection(self):
+        return self.database.get_collection(self.collection_name)
+
+    def append(self, record):
+        """Store a single chat record"""
+        self.collection.insert_one(record)
+
+    def append_many(self, records):
+        """
+        Store chat records with one unordered insert
+
+        Args:
+            records (list): Chat record dicts
+
+        Returns:
+            int: Number of records written
+        """
+        try:
+            return len(self.collection.insert_many(records, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            logger.error(f"Chat history insert partially failed: {e.details.get('writeErrors', [])[:3]}")
+            return e.details.get('nInserted', 0)
+
+    def recent(self, user_id, limit=10, before=None):
+        """
+        Latest messages of a user, newest first
+
+        Args:
+            user_id (str): Owner of the history
+            limit (int): Maximum number of messages
+            before (tuple): Optional (timestamp, _id) keyset cursor; only older messages are returned
+
+        Returns:
+            list: Projected message documents
+        """
+        query = {'user_id': user_id}
+        if before is not None:
+            timestamp, message_id = before
+            query['$or'] = [
+                {'timestamp': {'$lt': timestamp}},
+                {'timestamp': timestamp, '_id': {'$lt': message_id}},
+            ]
+        return list(
+            self.collection.find(query, MESSAGE_FIELDS)
+            .sort([('timestamp', -1), ('_id', -1)])
+            .limit(limit)
+        )
+
+    def export(self, user_id, batch_size=1000):
+        """
+        Stream every message of a user, oldest first
+
+        Args:
+            user_id (str): Owner of the history
+            batch_size (int): Documents fetched per cursor round trip
+
+        Returns:
+            iterator: Projected message documents
+        """
+        return self.collection.find({'user_id': user_id}, MESSAGE_FIELDS) \
+            .sort([('timestamp', 1), ('_id', 1)]) \
+            .batch_size(batch_size)
+
+
+class BucketChatStore:
+    """
+    Chat history appended into per-user, per-conversation bucket documents.
+
+    Each bucket holds at most `bucket_size` messages in a `messages` array
+    along with its message count and first/last timestamps. Appends are
+    upserts with `$push`/`$slice` into a bucket that still has room, so
+    reading the latest messages touches one or two documents and the index
+    holds one entry per bucket instead of one per message.
+    """
+
+    layout = 'bucket'
+
+    def __init__(self, database, collection='chat_buckets', bucket_size=100):
+        self.database = database
+        self.collection_name = collection
+        self.bucket_size = bucket_size
+
+    @property
+    def collection(self):
+        return self.database.get_collection(self.collection_name)
+
+    def append(self, record):
+        """Store a single chat record"""
+        self.append_many([record])
+
+    def _operations(self, records):
+        groups = OrderedDict()
+        for record in records:
+            try:
+                key = (record['user_id'], record.get('conversation_id') or DEFAULT_CONVERSATION)
+                groups.setdefault(key, []).append({
+                    '_id': record.get('_id') or ObjectId(),
+                    'user_message': record['user_message'],
+                    'bot_response': record['bot_response'],
+                    'timestamp': record['timestamp'],
+                })
+            except (KeyError, TypeError) as e:
+                # One malformed record must not fail the rest of a write-behind batch
+                logger.error(f"Skipping malformed chat record: {e!r}")
+
+        operations, sizes = [], []
+        for (user_id, conversation_id), messages in groups.items():
+            for start in range(0, len(messages), self.bucket_size):
+                chunk = messages[start:start + self.bucket_size]
+                operations.append(UpdateOne(
+                    {
+                        'user_id': user_id,
+                        'conversation_id': conversation_id,
+                        'count': {'$lte': self.bucket_size - len(chunk)},
+                    },
+                    {
+                        '$push': {'messages': {'$each': chunk, '$slice': -self.bucket_size}},
+                        '$inc': {'count': len(chunk)},
+                        '$min': {'start': chunk[0]['timestamp']},
+                        '$max': {'end': chunk[-1]['timestamp']},
+                    },
+                    upsert=True
+                ))
+                sizes.append(len(chunk))
+        return operations, sizes
+
+    def append_many(self, records):
+        """
+        Append chat records to their buckets with one unordered bulk write
+
+        Args:
+            records (list): Chat record dicts with user_id and optional conversation_id
+
+        Returns:
+            int: Number of records written
+        """
+        operations, sizes = self._operations(records)
+        if not operations:
+            return 0
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+            return sum(sizes)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            logger.error(f"Chat bucket write partially failed: {errors[:3]}")
+            return sum(sizes) - sum(sizes[error['index']] for error in errors)
+
+    def recent(self, user_id, limit=10, before=None):
+        """Latest messages of a user across conversations, newest first; see MessageChatStore.recent"""
+        query = {'user_id': user_id}
+        if before is not None:
+            # A bucket that started after the cursor holds nothing older than it
+            query['start'] = {'$lte': before[0]}
+        messages = []
+        oldest_kept = None
+        # Usually one or two buckets hold the page; fetch them in small round
+        # trips instead of a default first batch of up to 101 full buckets
+        cursor = self.collection.find(query, BUCKET_FIELDS) \
+            .sort('end', -1) \
+            .batch_size(limit // self.bucket_size + 2)
+        for bucket in cursor:
+            # Buckets of other conversations may still hold newer messages than
+            # the ones kept so far, so only stop once a bucket ends before them
+            if oldest_kept is not None and bucket['end'] < oldest_kept:
+                break
+            for message in bucket['messages']:
+                if before is not None and _sort_key(message) >= before:
+                    continue
+                messages.append(dict(message, conversation_id=bucket['conversation_id']))
+            if len(messages) >= limit:
+                messages.sort(key=_sort_key, reverse=True)
+                del messages[limit:]
+                oldest_kept = messages[-1]['timestamp']
+        messages.sort(key=_sort_key, reverse=True)
+        return messages[:limit]
+
+    def export(self, user_id, batch_size=1000):
+        """
+        Stream every message of a user bucket by bucket
+
+        Buckets are read in the order they were last written to, so messages
+        of concurrent conversations are grouped per bucket rather than merged
+        into one timeline; each bucket is held in memory only while it is written.
+        """
+        # Bucket documents are up to bucket_size times larger than messages
+        cursor = self.collection.find({'user_id': user_id}, BUCKET_FIELDS) \
+            .sort('end', 1) \
+            .batch_size(max(1, batch_size // self.bucket_size))
+        for bucket in cursor:
+            for message in bucket['messages']:
+                yield dict(message, conversation_id=bucket['conversation_id'])
+
+def create_chat_store(database, layout='message', bucket_size=100):
+    """
+    Create the chat history store for a storage layout
+
+    Args:
+        database (Database): Connected database wrapper
+        layout (str): "message" (one document per message) or "bucket"
+        bucket_size (int): Messages per bucket document for the "bucket" layout
+
+    Returns:
+        MessageChatStore or BucketChatStore: The store
+    """
+    if layout == MessageChatStore.layout:
+        return MessageChatStore(database)
+    if layout == BucketChatStore.layout:
+        return BucketChatStore(database, bucket_size=bucket_size)
+    raise ValueError(f"Unknown chat history layout: {layout}")
@@ -0,0 +1,152 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Queued by close() to wake a writer blocked waiting for records
+_STOP = object()
+
+
+class ChatHistoryWriter:
+    """
+    Write-behind buffer for chat history records.
+
+    Requests enqueue records and return immediately; a background thread
+    flushes them with one unordered bulk write per batch through the chat
+    store (insert_many for the message layout), when `flush_size`
+    records are waiting or `flush_interval` seconds have passed. The queue is
+    bounded: when Mongo falls behind, enqueue blocks for at most
+    `enqueue_timeout` seconds and then drops the record, counting it. The
+    buffer is drained by close(), which create_app runs at interpreter exit
+    (gunicorn worker shutdown included) before closing the database.
+    """
+
+    def __init__(self, store, flush_size=100, flush_interval=0.5, max_queue=10000,
+                 enqueue_timeout=0.05):
+        self.store = store
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue = None
+        self._batch = []
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+        self.last_flush_seconds = 0.0
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so each gunicorn worker starts its own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='chat-history-writer', daemon=True)
+            self._thread.start()
+
+    def enqueue(self, record):
+        """
+        Queue a chat record for the next flush
+
+        Args:
+            record (dict): Document to insert into the chat history collection
+
+        Returns:
+            bool: False if the queue stayed full and the record was dropped
+        """
+        self._ensure_started()
+        try:
+            self._queue.put(record, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Chat history queue full ({self.max_queue}), dropped a record")
+            return False
+        self.enqueued += 1
+        return True
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+            self._batch = []
+
+    def _next_batch(self):
+        # Kept on the writer so close() can count a batch it gives up on
+        batch = self._batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if self._stopping.is_set() or timeout <= 0:
+                    record = self._queue.get_nowait()
+                else:
+                    record = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if record is not _STOP:
+                batch.append(record)
+        return batch
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        try:
+            written = self.store.append_many(batch)
+            self.written += written
+            self.failed += len(batch) - written
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Chat history flush of {len(batch)} records failed: {e}")
+        finally:
+            elapsed = time.perf_counter() - start
+            self.flushes += 1
+            self.last_flush_seconds = elapsed
+            self.flush_seconds_total += elapsed
+            self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+
+    def close(self, timeout=5.0):
+        """Flush everything still queued and stop the background thread"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            pass  # A full queue never leaves the writer waiting in get()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            queued = sum(1 for record in list(self._queue.queue) if record is not _STOP)
+            logger.error(f"Chat history writer did not drain within {timeout}s, "
+                         f"{queued + len(self._batch)} records lost")
+
+    def stats(self):
+        """Queue depth, throughput and flush latency counters"""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 3),
+            "avg_flush_ms": round(self.flush_seconds_total / self.flushes * 1000, 3) if self.flushes else 0.0,
+            "max_flush_ms": round(self.flush_seconds_max * 1000, 3),
+        }
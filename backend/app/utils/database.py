@@ -1,14 +1,147 @@
 from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from pymongo.errors import ConnectionFailure, OperationFailure
+from pymongo.monitoring import ConnectionPoolListener
 import logging
+import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Server error code for dropping an index that does not exist
+INDEX_NOT_FOUND = 27
+
+class PoolStatsListener(ConnectionPoolListener):
+    """Connection pool counters from pymongo's CMAP events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Check-outs happen on the requesting thread, so it can time its own wait
+        self._local = threading.local()
+        self.open = 0
+        self.checked_out = 0
+        self.waiters = 0
+        self.max_waiters = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.clears = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _end_wait(self):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        waited = time.perf_counter() - started if started is not None else 0.0
+        self.waiters -= 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        with self._lock:
+            self.waiters += 1
+            self.max_waiters = max(self.max_waiters, self.waiters)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self._end_wait()
+            self.checked_out += 1
+            self.checkouts += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._end_wait()
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.clears += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def stats(self):
+        """Current pool usage and check-out wait times"""
+        attempts = self.checkouts + self.checkout_failures
+        return {
+            "open": self.open,
+            "checked_out": self.checked_out,
+            "waiters": self.waiters,
+            "max_waiters": self.max_waiters,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "pool_clears": self.clears,
+            "avg_wait_ms": round(self.wait_seconds_total / attempts * 1000, 3) if attempts else 0.0,
+            "max_wait_ms": round(self.wait_seconds_max * 1000, 3),
+        }
+
 class Database:
-    def __init__(self, uri):
-        self.client = MongoClient(uri)
-        self.db = self.client.get_default_database()
-        
+    """
+    MongoDB connection wrapper whose client is created on first use in each process.
+
+    MongoClient is not fork-safe, and create_app runs before gunicorn forks
+    when the app is preloaded, so every worker lazily opens its own client
+    (and pool); create_app closes it on exit, after the chat writer. Keyword arguments are passed to
+    MongoClient as pool options (maxPoolSize, minPoolSize,
+    waitQueueTimeoutMS, serverSelectionTimeoutMS, ...); `listeners` are
+    extra pymongo event listeners, e.g. command timing for /metrics.
+    """
+
+    def __init__(self, uri, listeners=(), **client_options):
+        self.uri = uri
+        self.listeners = list(listeners)
+        self.client_options = client_options
+        self.pool_stats = PoolStatsListener()
+        self._client = None
+        self._db = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._collections_ready = False
+        self._init_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is not None and self._pid == os.getpid():
+            return self._client
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                if self._client is not None:
+                    # Inherited from the parent: drop it without closing the
+                    # parent's sockets, and start this worker's counters afresh
+                    self.pool_stats = PoolStatsListener()
+                self._client = MongoClient(
+                    self.uri, event_listeners=[self.pool_stats, *self.listeners], **self.client_options
+                )
+                self._db = self._client.get_default_database()
+                self._pid = os.getpid()
+        return self._client
+
+    @property
+    def db(self):
+        self.client  # Opens this process's connection on first use
+        return self._db
+
     def test_connection(self):
         """Test the database connection"""
         try:
@@ -29,22 +162,59 @@ class Database:
             
             # Chat history collection
             chat_history = self.db.chat_history
-            chat_history.create_index([("user_id", 1), ("timestamp", -1)])
+            # _id breaks timestamp ties so keyset pages are served straight from the index
+            chat_history.create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)])
+            # It covers every query of the old (user_id, timestamp) index, which
+            # would otherwise only cost index maintenance on every insert
+            try:
+                chat_history.drop_index([("user_id", 1), ("timestamp", -1)])
+            except OperationFailure as e:
+                # Already dropped by an earlier start or another worker
+                # (mongomock reports it without a code)
+                if e.code != INDEX_NOT_FOUND and 'index not found' not in str(e):
+                    raise
+            
+            # Bucketed chat history layout (CHAT_HISTORY_LAYOUT=bucket)
+            chat_buckets = self.db.chat_buckets
+            chat_buckets.create_index([("user_id", 1), ("end", -1)])
+            chat_buckets.create_index([("user_id", 1), ("conversation_id", 1), ("count", 1)])
             
             # Career recommendations collection
             career_data = self.db.career_data
             career_data.create_index("career_title")
             
             logger.info("Database collections initialized successfully")
+            self._collections_ready = True
             return True
         except Exception as e:
             logger.error(f"Failed to initialize collections: {e}")
             return False
             
+    def _ensure_collections(self):
+        # create_app could not create the indexes (e.g. Mongo was down at
+        # startup); retry before the collections are used, so users are never
+        # inserted for long without the unique email index. One attempt at a
+        # time: while Mongo is down each one waits for server selection
+        if self._collections_ready or not self._init_lock.acquire(blocking=False):
+            return
+        try:
+            if not self._collections_ready:
+                self.init_collections()
+        finally:
+            self._init_lock.release()
+            
     def get_collection(self, name):
-        """Get a collection by name"""
+        """Get a collection by name, creating the indexes first if that has not succeeded yet"""
+        self._ensure_collections()
         return self.db[name]
         
+    def stats(self):
+        """Connection pool statistics of this process"""
+        return self.pool_stats.stats()
+        
     def close(self):
-        """Close the database connection"""
-        self.client.close() 
\ No newline at end of file
+        """Close this process's connection, if it opened one"""
+        if self._client is not None and self._pid == os.getpid():
+            self._client.close()
+            self._client = None
+            self._db = None
@@ -30,11 +30,19 @@ class AuthorizationError(APIError):
     def __init__(self, message):
         super().__init__(message, status_code=403)
 
+class ServiceUnavailableError(APIError):
+    """Temporary overload; the client should retry after `retry_after` seconds"""
+    def __init__(self, message, retry_after=1):
+        super().__init__(message, status_code=503)
+        self.retry_after = retry_after
+
 def register_error_handlers(app):
     @app.errorhandler(APIError)
     def handle_api_error(error):
         response = jsonify(error.to_dict())
         response.status_code = error.status_code
+        if getattr(error, 'retry_after', None):
+            response.headers['Retry-After'] = str(error.retry_after)
         return response
 
     @app.errorhandler(HTTPException)
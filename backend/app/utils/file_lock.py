@@ -0,0 +1,39 @@
+"""flock helpers for state that gunicorn workers share through files"""
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
+
+# Without flock the locks below are no-ops; callers that must still
+# serialize their own threads check this and fall back to in-process locks
+HAS_FLOCK = fcntl is not None
+
+
+def lock_file(file, exclusive=True, blocking=True):
+    """
+    flock an open file
+
+    Args:
+        file: Open file object
+        exclusive (bool): Exclusive lock, or shared for readers
+        blocking (bool): Wait for the lock instead of failing at once
+
+    Returns:
+        bool: False if blocking is off and another descriptor holds the lock
+    """
+    if fcntl is None:
+        return True
+    flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    if not blocking:
+        flags |= fcntl.LOCK_NB
+    try:
+        fcntl.flock(file, flags)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def unlock_file(file):
+    """Release a lock taken with lock_file"""
+    if fcntl is not None:
+        fcntl.flock(file, fcntl.LOCK_UN)
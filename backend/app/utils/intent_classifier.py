@@ -0,0 +1,124 @@
+import json
+import logging
+import os
+import re
+import sys
+from collections import Counter
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+DEFAULT_EXAMPLES_PATH = os.path.join(DATA_DIR, 'intent_examples.json')
+DEFAULT_MODEL_PATH = os.path.join(DATA_DIR, 'intent_model.json')
+
+# Messages scoring below this against every centroid fall back to "default"
+DEFAULT_MIN_SCORE = 0.2
+
+_WORD = re.compile(r"[a-z0-9+#']+")
+
+
+def analyze(text):
+    """Unigrams and bigrams of a message; shared by training and inference"""
+    words = _WORD.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class IntentClassifier:
+    """
+    Nearest-centroid intent classifier in a small TF-IDF space.
+
+    The model is fitted offline with scikit-learn (see train()) and stored as
+    JSON; loading it needs no fitting, and classifying a message is one
+    tokenization plus a dot product against a handful of dense centroids.
+    """
+
+    def __init__(self, intents, vocabulary, idf, centroids, min_score=DEFAULT_MIN_SCORE):
+        self.intents = list(intents)
+        self.vocabulary = vocabulary
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.min_score = min_score
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        """Load a model written by save()"""
+        with open(path, encoding='utf-8') as f:
+            model = json.load(f)
+        return cls(
+            model["intents"], model["vocabulary"], model["idf"], model["centroids"],
+            min_score=model.get("min_score", DEFAULT_MIN_SCORE)
+        )
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        """Serialize the fitted model as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "intents": self.intents,
+                "vocabulary": self.vocabulary,
+                "idf": [round(float(x), 6) for x in self.idf],
+                "centroids": [[round(float(x), 6) for x in row] for row in self.centroids],
+                "min_score": self.min_score,
+            }, f, separators=(",", ":"))
+
+    def classify(self, message):
+        """
+        Classify a message
+
+        Args:
+            message (str): Raw user message
+
+        Returns:
+            tuple: (intent, score); intent is "default" when nothing is close enough
+        """
+        counts = Counter(term for term in analyze(message) if term in self.vocabulary)
+        if not counts:
+            return 'default', 0.0
+        columns = np.fromiter((self.vocabulary[term] for term in counts), dtype=np.intp)
+        weights = np.fromiter(counts.values(), dtype=np.float64) * self.idf[columns]
+        weights /= np.linalg.norm(weights)
+        scores = self.centroids[:, columns] @ weights
+        best = int(scores.argmax())
+        if scores[best] < self.min_score:
+            return 'default', float(scores[best])
+        return self.intents[best], float(scores[best])
+
+
+def train(examples, min_score=DEFAULT_MIN_SCORE):
+    """
+    Fit an IntentClassifier from example utterances
+
+    Args:
+        examples (dict): Intent name -> list of example messages
+        min_score (float): Similarity below which messages fall back to "default"
+
+    Returns:
+        IntentClassifier: The fitted model
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    intents = sorted(examples)
+    texts = [text for intent in intents for text in examples[intent]]
+    labels = np.array([i for i, intent in enumerate(intents) for _ in examples[intent]])
+
+    vectorizer = TfidfVectorizer(analyzer=analyze, norm='l2')
+    matrix = vectorizer.fit_transform(texts)
+
+    centroids = np.vstack([np.asarray(matrix[labels == i].mean(axis=0)).ravel() for i in range(len(intents))])
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    vocabulary = {term: int(col) for term, col in vectorizer.vocabulary_.items()}
+    return IntentClassifier(intents, vocabulary, vectorizer.idf_, centroids, min_score=min_score)
+
+
+if __name__ == "__main__":
+    # Retrain after editing the examples:
+    #   python -m app.utils.intent_classifier [examples.json] [model.json]
+    logging.basicConfig(level=logging.INFO)
+    examples_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_EXAMPLES_PATH
+    model_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_MODEL_PATH
+    with open(examples_path, encoding='utf-8') as f:
+        model = train(json.load(f))
+    model.save(model_path)
+    logger.info(f"Saved intent model with {len(model.vocabulary)} terms to {model_path}")
@@ -0,0 +1,72 @@
+import json
+import os
+import re
+from collections import namedtuple
+
+DEFAULT_INTENTS_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'intents.json')
+
+IntentMatch = namedtuple('IntentMatch', ['intent', 'keyword', 'priority'])
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(message):
+    """Lower-case word tokens of a chat message"""
+    return _WORD.findall(message.lower())
+
+
+class IntentMatcher:
+    """
+    Keyword intent matcher compiled into a single phrase lookup table.
+
+    Keywords match whole words only ("hi" does not fire on "this"), and
+    multi-word keywords are matched longest-first. The message is tokenized
+    once and each position costs at most `max_phrase_length` dict lookups,
+    so matching stays flat as intents and keywords grow. When several
+    intents match, the one with the lowest priority number wins.
+    """
+
+    def __init__(self, intents):
+        self.table = {}
+        self.max_phrase_length = 1
+        for intent in intents:
+            for keyword in intent["keywords"]:
+                phrase = tuple(tokenize(keyword))
+                if not phrase:
+                    continue
+                match = IntentMatch(intent["name"], keyword, intent.get("priority", 100))
+                current = self.table.get(phrase)
+                if current is None or match.priority < current.priority:
+                    self.table[phrase] = match
+                self.max_phrase_length = max(self.max_phrase_length, len(phrase))
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_INTENTS_PATH):
+        """Load intents and keywords from a JSON data file"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f)["intents"])
+
+    def match(self, message):
+        """
+        Find the intent of a message
+
+        Args:
+            message (str): Raw user message
+
+        Returns:
+            IntentMatch: Winning intent and the keyword that fired, or None
+        """
+        tokens = tokenize(message)
+        best = None
+        i = 0
+        while i < len(tokens):
+            step = 1
+            for length in range(min(self.max_phrase_length, len(tokens) - i), 0, -1):
+                match = self.table.get(tuple(tokens[i:i + length]))
+                if match is not None:
+                    if best is None or match.priority < best.priority:
+                        best = match
+                    step = length
+                    break
+            i += step
+        return best
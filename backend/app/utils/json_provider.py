@@ -0,0 +1,50 @@
+from datetime import date
+
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Falls back to the stdlib encoder
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, ObjectId):
+        return str(o)
+    # datetime is a date subclass; ISO 8601 instead of Flask's HTTP dates
+    if isinstance(o, date):
+        return o.isoformat()
+    # NumPy scalars and arrays, e.g. recommender scores; checked by module
+    # so serializing does not import numpy
+    if type(o).__module__ == 'numpy':
+        return o.tolist()
+    return DefaultJSONProvider.default(o)
+
+
+class APIJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider for every API response (jsonify, Response.json).
+
+    Encodes ObjectId, datetime and NumPy values in the same pass as the rest
+    of the document, so routes can return Mongo documents and recommender
+    output as they are. Uses orjson when it is installed and the call needs
+    nothing beyond compact or indented output, the stdlib encoder otherwise.
+    """
+
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and set(kwargs) <= {'indent', 'separators'}:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
@@ -0,0 +1,331 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from pymongo.monitoring import CommandListener
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; the last bucket is +Inf
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "pathpilot_http_request_duration_seconds": ("histogram", "Request latency by endpoint"),
+    "pathpilot_http_request_mongo_seconds": ("histogram", "Time a request spent in Mongo commands"),
+    "pathpilot_http_requests_total": ("counter", "Requests by endpoint and status"),
+    "pathpilot_http_requests_in_flight": ("gauge", "Requests being served"),
+    "pathpilot_mongo_command_duration_seconds": ("histogram", "Mongo command latency by command and endpoint"),
+    "pathpilot_mongo_command_failures_total": ("counter", "Failed Mongo commands"),
+    "pathpilot_password_hash_duration_seconds": ("histogram", "bcrypt hash and verify time, excluding the wait for an auth slot"),
+    "pathpilot_recommender_duration_seconds": ("histogram", "Recommender scoring time on cache misses"),
+}
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class MetricsRegistry:
+    """
+    Per-process counters, gauges and histograms, merged across workers on scrape.
+
+    Each gunicorn worker records into its own registry and a background thread
+    writes a snapshot to `directory` every `flush_interval` seconds while
+    anything changed. render() merges the snapshots of all workers into
+    Prometheus text: counters and histograms are summed over every worker
+    that ever wrote one (so they never go backwards when a worker restarts),
+    gauges only over workers that are still alive.
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0, enabled=True):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._dirty = False
+        self._thread = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def configure(self, directory, flush_interval=1.0, enabled=True):
+        """Set where snapshots are shared; called from create_app"""
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            self._dirty = True
+        self._ensure_flusher()
+
+    def gauge_add(self, name, delta, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + delta
+            self._dirty = True
+        self._ensure_flusher()
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0]
+            histogram[0][bisect_left(BUCKETS, value)] += 1
+            histogram[1] += value
+            self._dirty = True
+        self._ensure_flusher()
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the duration of a with-block into a histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        """JSON-serializable copy of this process's metrics"""
+        with self._lock:
+            self._dirty = False
+            return {
+                "pid": os.getpid(),
+                "counters": [[name, labels, value] for (name, labels), value in self._counters.items()],
+                "gauges": [[name, labels, value] for (name, labels), value in self._gauges.items()],
+                "histograms": [
+                    [name, labels, list(buckets), total]
+                    for (name, labels), (buckets, total) in self._histograms.items()
+                ],
+            }
+
+    def _ensure_flusher(self):
+        if self.directory is None or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='metrics-flusher', daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _after_fork(self):
+        # Values inherited from the master belong to the master's snapshot,
+        # and its flusher thread did not survive the fork
+        self._lock = threading.Lock()
+        self._counters, self._gauges, self._histograms = {}, {}, {}
+        self._dirty = False
+        self._thread = None
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                self.flush()
+
+    def flush(self):
+        """Write this process's snapshot for the other workers to read"""
+        if self.directory is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+            tmp = f"{path}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(self.snapshot(), f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.error(f"Could not write metrics snapshot: {e}")
+
+    def _snapshots(self):
+        own = self.snapshot()
+        # Keep this process's file current so concurrent scrapes agree
+        self._dirty = True
+        snapshots = [own]
+        if self.directory is None:
+            return snapshots
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if snapshot["pid"] != own["pid"]:
+                snapshots.append(snapshot)
+        return snapshots
+
+    def render(self):
+        """All workers' metrics in the Prometheus text exposition format"""
+        counters, gauges, histograms = {}, {}, {}
+        for snapshot in self._snapshots():
+            alive = _is_alive(snapshot["pid"])
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            if alive:
+                for name, labels, value in snapshot["gauges"]:
+                    key = (name, tuple(map(tuple, labels)))
+                    gauges[key] = gauges.get(key, 0) + value
+            for name, labels, buckets, total in snapshot["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(key, [[0] * len(buckets), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+                merged[1] += total
+
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name not in described and name in HELP:
+                kind, text = HELP[name]
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+                described.add(name)
+
+        for (name, labels), value in sorted(counters.items()):
+            describe(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), value in sorted(gauges.items()):
+            describe(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), (buckets, total) in sorted(histograms.items()):
+            describe(name)
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+def _is_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def clear_snapshots(directory):
+    """Remove snapshots left by a previous run; called before workers start"""
+    for path in glob.glob(os.path.join(directory, "metrics-*.json*")):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class MongoCommandMetrics(CommandListener):
+    """
+    Times every Mongo command by command name and the endpoint that issued it.
+
+    Listener callbacks run on the thread (or greenlet) that sent the command,
+    so the request context is still available to attribute the time.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    def _record(self, event, failed):
+        from flask import g, has_request_context, request
+
+        seconds = event.duration_micros / 1e6
+        endpoint = "background"
+        if has_request_context():
+            endpoint = request.endpoint or "unmatched"
+            g.mongo_seconds = g.get("mongo_seconds", 0.0) + seconds
+        self.registry.observe(
+            "pathpilot_mongo_command_duration_seconds", seconds,
+            command=event.command_name, endpoint=endpoint
+        )
+        if failed:
+            self.registry.inc("pathpilot_mongo_command_failures_total", command=event.command_name)
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, failed=False)
+
+    def failed(self, event):
+        self._record(event, failed=True)
+
+
+def register_request_metrics(app, registry=None):
+    """
+    Record latency, status and in-flight counts for every request.
+
+    Must be called before other extensions add before_request hooks, so
+    requests they reject (e.g. rate limited ones) are still timed.
+    """
+    from flask import g, request
+
+    registry = registry or metrics
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.mongo_seconds = 0.0
+        registry.gauge_add("pathpilot_http_requests_in_flight", 1)
+
+    @app.after_request
+    def record_request(response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+        # Unmatched URLs share one label so scanners cannot blow up cardinality
+        endpoint = request.endpoint or "unmatched"
+        registry.observe(
+            "pathpilot_http_request_duration_seconds", time.perf_counter() - started,
+            endpoint=endpoint, method=request.method
+        )
+        registry.observe("pathpilot_http_request_mongo_seconds", g.mongo_seconds, endpoint=endpoint)
+        registry.inc(
+            "pathpilot_http_requests_total",
+            endpoint=endpoint, method=request.method, status=response.status_code
+        )
+        return response
+
+    @app.teardown_request
+    def end_request(exc):
+        # Runs even when a response could not be built
+        if g.pop("request_started", None) is not None:
+            registry.gauge_add("pathpilot_http_requests_in_flight", -1)
+
+
+# Process-wide registry shared by the request hooks, the Mongo listener,
+# the password hasher and the recommender
+metrics = MetricsRegistry()
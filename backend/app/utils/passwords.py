@@ -0,0 +1,195 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+from .file_lock import HAS_FLOCK, lock_file, unlock_file
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# How often a request waiting for an auth slot retries
+SLOT_POLL_INTERVAL = 0.01
+
+
+def hash_password(password, rounds):
+    """bcrypt-hash encoded password bytes; module-level so process pools can pickle it"""
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def check_password(password, hashed):
+    """Check encoded password bytes against a bcrypt hash"""
+    return bcrypt.checkpw(password, hashed)
+
+
+def hash_rounds(hashed):
+    """Work factor encoded in a bcrypt hash ("$2b$<rounds>$...")"""
+    return int(hashed.split(b'$')[2])
+
+
+class HasherBusy(Exception):
+    """Raised when no auth slot frees up within the queue timeout"""
+
+
+class _AuthSlots:
+    """
+    Host-wide cap on concurrent password hashes.
+
+    Each slot is an flock'ed file, so the cap holds across every gunicorn
+    worker on the machine: a login storm can occupy at most `count` workers
+    and the rest keep serving other endpoints. Falls back to a per-process
+    semaphore where fcntl is unavailable.
+    """
+
+    def __init__(self, directory, count):
+        self.directory = directory
+        self.count = max(1, count)
+        self._semaphore = threading.BoundedSemaphore(self.count)
+
+    def _try_slot(self, index):
+        # A fresh descriptor per attempt: flock is per open file description,
+        # so a descriptor shared by two threads (or greenlets) of one worker
+        # would let both of them "hold" the same slot
+        slot = open(os.path.join(self.directory, f"auth-slot-{index}.lock"), "a")
+        if lock_file(slot, blocking=False):
+            return slot
+        slot.close()
+        return None
+
+    def acquire(self, timeout):
+        """Take a free slot, waiting up to timeout seconds; returns the slot or None"""
+        # Threads of one worker queue on the semaphore before competing for files
+        if not self._semaphore.acquire(timeout=timeout):
+            return None
+        if not HAS_FLOCK:
+            return self._semaphore
+        os.makedirs(self.directory, exist_ok=True)
+        deadline = time.monotonic() + timeout
+        while True:
+            for index in range(self.count):
+                slot = self._try_slot(index)
+                if slot is not None:
+                    return slot
+            if time.monotonic() >= deadline:
+                self._semaphore.release()
+                return None
+            time.sleep(SLOT_POLL_INTERVAL)
+
+    def release(self, slot):
+        if slot is not self._semaphore:
+            unlock_file(slot)
+            slot.close()
+        self._semaphore.release()
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing in a bounded process pool, behind a host-wide slot limit.
+
+    Hashes run in `workers` child processes per gunicorn worker (created
+    lazily after fork) so they use every core without holding the GIL of the
+    request thread; `workers=0` hashes inline. At most `max_concurrent`
+    hashes run on the host at once and a request that cannot get a slot
+    within `queue_timeout` seconds fails with HasherBusy instead of queueing
+    behind the storm.
+    """
+
+    def __init__(self, rounds=12, workers=1, max_concurrent=2, queue_timeout=0.5, slot_dir=None):
+        self.rounds = rounds
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._slots = _AuthSlots(slot_dir or os.path.join('instance', 'auth_slots'), max_concurrent)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        self.hashes = 0
+        self.verifications = 0
+        self.rehashes = 0
+        self.rejected = 0
+        self.seconds_total = 0.0
+
+    def _pool(self, broken=None):
+        # Process pools do not survive fork, so each gunicorn worker starts its own.
+        # A pool whose child died (e.g. OOM-killed) is replaced once by whichever
+        # request notices first
+        stale = broken is not None and self._executor is broken
+        if self._executor is not None and self._pid == os.getpid() and not stale:
+            return self._executor
+        with self._lock:
+            stale = broken is not None and self._executor is broken
+            if self._executor is None or self._pid != os.getpid() or stale:
+                if stale:
+                    logger.warning("Password hashing pool broke; starting a new one")
+                    broken.shutdown(wait=False)
+                self._pid = os.getpid()
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                atexit.register(self._executor.shutdown, wait=False)
+        return self._executor
+
+    def _submit(self, fn, *args):
+        executor = self._pool()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            return self._pool(broken=executor).submit(fn, *args).result()
+
+    def _run(self, operation, fn, *args):
+        slot = self._slots.acquire(self.queue_timeout)
+        if slot is None:
+            self.rejected += 1
+            raise HasherBusy("Too many concurrent sign-ins, try again shortly")
+        start = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                return fn(*args)
+            return self._submit(fn, *args)
+        finally:
+            self._slots.release(slot)
+            elapsed = time.perf_counter() - start
+            self.seconds_total += elapsed
+            metrics.observe('pathpilot_password_hash_duration_seconds', elapsed, operation=operation)
+
+    def hash(self, password):
+        """
+        Hash a password with the configured work factor
+
+        Args:
+            password (str): Plain-text password
+
+        Returns:
+            bytes: bcrypt hash
+
+        Raises:
+            HasherBusy: If no auth slot freed up in time
+        """
+        self.hashes += 1
+        return self._run('hash', hash_password, password.encode('utf-8'), self.rounds)
+
+    def verify(self, password, hashed):
+        """Check a password against a stored bcrypt hash; raises HasherBusy like hash()"""
+        self.verifications += 1
+        return self._run('verify', check_password, password.encode('utf-8'), hashed)
+
+    def needs_rehash(self, hashed):
+        """True when a stored hash uses a different work factor than configured"""
+        return hash_rounds(hashed) != self.rounds
+
+    def stats(self):
+        """Counters for monitoring"""
+        operations = self.hashes + self.verifications
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_concurrent": self._slots.count,
+            "hashes": self.hashes,
+            "verifications": self.verifications,
+            "rehashes": self.rehashes,
+            "rejected": self.rejected,
+            "avg_ms": round(self.seconds_total / operations * 1000, 3) if operations else 0.0,
+        }
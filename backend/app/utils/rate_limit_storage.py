@@ -0,0 +1,153 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+
+from limits.storage import Storage
+
+from .file_lock import lock_file, unlock_file
+
+# Slot layout: 64-bit key hash, counter, expiry as a unix timestamp
+_SLOT = struct.Struct('<Qqd')
+DEFAULT_SLOTS = 65536
+# Slots scanned from a key's home position before evicting the soonest-expiring one
+MAX_PROBES = 16
+
+
+def _key_hash(key):
+    # 0 marks an empty slot
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+
+class MmapStorage(Storage):
+    """
+    Fixed-window rate-limit counters in a memory-mapped file shared by all workers.
+
+    Registered for ``mmap://<path>`` URIs, e.g. ``mmap:///dev/shm/pathpilot-ratelimit``
+    (``RATELIMIT_STORAGE_OPTIONS={"slots": ...}`` sizes the table). Counters live in a fixed
+    open-addressing table of 24-byte slots, so every gunicorn worker on the host
+    counts against the same limit and counters survive worker restarts. Each
+    operation takes an flock on the file, so it only supports single-host
+    deployments; use ``mongodb://`` for several hosts.
+    """
+
+    STORAGE_SCHEME = ['mmap']
+
+    def __init__(self, uri, wrap_exceptions=False, slots=DEFAULT_SLOTS, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = uri[len('mmap://'):].split('?')[0] or os.path.join('instance', 'ratelimit.mmap')
+        self.slots = int(slots)
+        self._file = None
+        self._map = None
+        self._pid = None
+        self._thread_lock = threading.Lock()
+
+    @property
+    def base_exceptions(self):
+        return OSError
+
+    def _open(self):
+        # flock is tied to the open file, so each forked worker opens its own
+        if self._map is not None and self._pid == os.getpid():
+            return self._map
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        size = self.slots * _SLOT.size
+        self._file = open(self.path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size < size:
+            self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._pid = os.getpid()
+        return self._map
+
+    def _locked(self):
+        return _FileLock(self)
+
+    def _find(self, data, key_hash, now, create):
+        home = key_hash % self.slots
+        free = None
+        oldest, oldest_expiry = None, None
+        for probe in range(MAX_PROBES):
+            offset = ((home + probe) % self.slots) * _SLOT.size
+            slot_hash, count, expiry = _SLOT.unpack_from(data, offset)
+            if slot_hash == key_hash:
+                return offset
+            if free is None and (slot_hash == 0 or expiry <= now):
+                free = offset
+            if oldest is None or expiry < oldest_expiry:
+                oldest, oldest_expiry = offset, expiry
+        if not create:
+            return None
+        return free if free is not None else oldest
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        key_hash = _key_hash(key)
+        with self._locked() as data:
+            now = time.time()
+            offset = self._find(data, key_hash, now, create=True)
+            slot_hash, count, expires_at = _SLOT.unpack_from(data, offset)
+            if slot_hash != key_hash or expires_at <= now:
+                count, expires_at = 0, now + expiry
+            count += amount
+            if elastic_expiry:
+                expires_at = now + expiry
+            _SLOT.pack_into(data, offset, key_hash, count, expires_at)
+            return count
+
+    def get(self, key):
+        key_hash = _key_hash(key)
+        with self._locked() as data:
+            now = time.time()
+            offset = self._find(data, key_hash, now, create=False)
+            if offset is None:
+                return 0
+            _, count, expires_at = _SLOT.unpack_from(data, offset)
+            return count if expires_at > now else 0
+
+    def get_expiry(self, key):
+        key_hash = _key_hash(key)
+        with self._locked() as data:
+            now = time.time()
+            offset = self._find(data, key_hash, now, create=False)
+            if offset is None:
+                return now
+            return max(_SLOT.unpack_from(data, offset)[2], now)
+
+    def check(self):
+        try:
+            self._open()
+            return True
+        except OSError:
+            return False
+
+    def reset(self):
+        with self._locked() as data:
+            data[:] = bytes(len(data))
+        return None
+
+    def clear(self, key):
+        key_hash = _key_hash(key)
+        with self._locked() as data:
+            offset = self._find(data, key_hash, time.time(), create=False)
+            if offset is not None:
+                _SLOT.pack_into(data, offset, 0, 0, 0.0)
+
+
+class _FileLock:
+    """Exclusive lock over the counter table for one storage operation"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def __enter__(self):
+        self.storage._thread_lock.acquire()
+        data = self.storage._open()
+        lock_file(self.storage._file)
+        return data
+
+    def __exit__(self, *exc):
+        unlock_file(self.storage._file)
+        self.storage._thread_lock.release()
@@ -0,0 +1,209 @@
+import time
+
+import numpy as np
+from scipy import sparse
+
+def top_k_indices(scores, k):
+    """
+    Indices of the k highest scores in each row, best first
+
+    Uses argpartition so only the k selected scores are sorted.
+
+    Args:
+        scores (numpy.ndarray): 1-D scores or a 2-D matrix of per-row scores
+        k (int): Number of indices to keep per row
+
+    Returns:
+        numpy.ndarray: Array of shape (rows, min(k, columns))
+    """
+    scores = np.atleast_2d(scores)
+    k = max(0, min(k, scores.shape[1]))
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+# Up to this many query rows are densified before the product; CSR times a
+# dense block avoids transposing the career matrix on every request
+DENSE_QUERY_ROWS = 32
+
+
+def _dot_rows(matrix, user_matrix):
+    """Scores of shape (matrix rows, user rows)"""
+    if user_matrix.shape[0] <= DENSE_QUERY_ROWS:
+        return matrix @ user_matrix.T.toarray()
+    return (matrix @ user_matrix.T).toarray()
+
+
+class ExactBackend:
+    """Brute-force cosine similarity against every career"""
+
+    name = "exact"
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+
+    def search(self, user_matrix, k):
+        """
+        Find the k most similar careers for each user row
+
+        Args:
+            user_matrix (scipy.sparse.csr_matrix): L2-normalized user vectors
+            k (int): Number of results per row
+
+        Returns:
+            list: One (career_indices, scores) tuple per user row, best first
+        """
+        scores = _dot_rows(self.matrix, user_matrix).T
+        top = top_k_indices(scores, k)
+        return [(top[row], scores[row, top[row]]) for row in range(scores.shape[0])]
+
+    def stats(self):
+        return {"backend": self.name}
+
+
+class IVFBackend:
+    """
+    Approximate search with an inverted-file (IVF) index.
+
+    Careers are clustered with spherical k-means; a query is only compared
+    with the careers in the `n_probe` clusters whose centroids are closest,
+    so per-request cost scales with the probed lists instead of the catalog.
+    """
+
+    name = "ivf"
+
+    def __init__(self, matrix, n_lists=0, n_probe=8, iterations=10, seed=0):
+        start = time.perf_counter()
+        self.matrix = matrix
+        n_careers = matrix.shape[0]
+        self.n_lists = max(1, min(n_lists or int(np.sqrt(n_careers)), n_careers))
+        self.n_probe = max(1, min(n_probe, self.n_lists))
+        self.centroids, assignments = _spherical_kmeans(matrix, self.n_lists, iterations, seed)
+
+        # Career ids grouped by list, with list boundaries in list_offsets
+        self.list_members = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=self.n_lists)
+        self.list_offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.build_time = time.perf_counter() - start
+
+    def search(self, user_matrix, k):
+        """
+        Find approximately the k most similar careers for each user row
+
+        Args:
+            user_matrix (scipy.sparse.csr_matrix): L2-normalized user vectors
+            k (int): Number of results per row
+
+        Returns:
+            list: One (career_indices, scores) tuple per user row, best first
+        """
+        centroid_scores = np.asarray(user_matrix @ self.centroids.T)
+        probes = top_k_indices(centroid_scores, self.n_probe)
+
+        results = []
+        for row, lists in enumerate(probes):
+            candidates = np.concatenate([
+                self.list_members[self.list_offsets[i]:self.list_offsets[i + 1]] for i in lists
+            ])
+            scores = _dot_rows(self.matrix[candidates], user_matrix[row]).ravel()
+            top = top_k_indices(scores, k)[0]
+            results.append((candidates[top], scores[top]))
+        return results
+
+    def stats(self):
+        return {
+            "backend": self.name,
+            "n_lists": self.n_lists,
+            "n_probe": self.n_probe,
+            "centroid_bytes": int(self.centroids.nbytes),
+            "backend_build_seconds": round(self.build_time, 6),
+        }
+
+
+def _spherical_kmeans(matrix, n_clusters, iterations, seed, chunk_size=8192):
+    """Cluster L2-normalized rows by cosine similarity; returns (centroids, assignments)"""
+    rng = np.random.default_rng(seed)
+    n_rows = matrix.shape[0]
+    centroids = matrix[rng.choice(n_rows, n_clusters, replace=False)].toarray()
+    assignments = np.zeros(n_rows, dtype=np.intp)
+
+    for _ in range(iterations):
+        # Assign in chunks to keep the dense similarity block bounded
+        for start in range(0, n_rows, chunk_size):
+            block = np.asarray(matrix[start:start + chunk_size] @ centroids.T)
+            assignments[start:start + chunk_size] = block.argmax(axis=1)
+
+        membership = sparse.csr_matrix(
+            (np.ones(n_rows), (assignments, np.arange(n_rows))), shape=(n_clusters, n_rows)
+        )
+        sums = (membership @ matrix).toarray()
+        norms = np.linalg.norm(sums, axis=1)
+        # Empty clusters keep their previous centroid
+        filled = norms > 0
+        centroids[filled] = sums[filled] / norms[filled, None]
+
+    return centroids, assignments
+
+
+def create_backend(name, matrix, **options):
+    """
+    Create a similarity backend by name
+
+    Args:
+        name (str): "exact" or "ivf"
+        matrix (scipy.sparse.csr_matrix): L2-normalized career matrix
+        **options: Backend-specific options, e.g. n_lists and n_probe for "ivf"
+
+    Returns:
+        ExactBackend or IVFBackend: The backend
+    """
+    if name == ExactBackend.name:
+        return ExactBackend(matrix)
+    if name == IVFBackend.name:
+        return IVFBackend(matrix, **options)
+    raise ValueError(f"Unknown similarity backend: {name}")
+
+
+def compare_backends(exact, candidate, user_matrix, k):
+    """
+    Measure recall@k and per-query latency of a backend against exact search
+
+    Args:
+        exact (ExactBackend): Reference backend
+        candidate: Backend under test
+        user_matrix (scipy.sparse.csr_matrix): Query vectors, one per row
+        k (int): Number of results per query
+
+    Returns:
+        dict: recall_at_k plus p50/p95 latency in milliseconds for both backends
+    """
+    def timed(backend):
+        latencies, results = [], []
+        for row in range(user_matrix.shape[0]):
+            start = time.perf_counter()
+            results.append(backend.search(user_matrix[row], k)[0])
+            latencies.append((time.perf_counter() - start) * 1000)
+        return results, np.array(latencies)
+
+    truth, exact_ms = timed(exact)
+    approx, candidate_ms = timed(candidate)
+
+    hits, total = 0, 0
+    for (true_ids, true_scores), (found_ids, _) in zip(truth, approx):
+        relevant = set(true_ids[true_scores > 0].tolist())
+        hits += len(relevant & set(found_ids.tolist()))
+        total += len(relevant)
+
+    return {
+        "backend": candidate.name,
+        "k": k,
+        "queries": user_matrix.shape[0],
+        "recall_at_k": round(hits / total, 4) if total else 1.0,
+        "exact_p50_ms": round(float(np.percentile(exact_ms, 50)), 4),
+        "exact_p95_ms": round(float(np.percentile(exact_ms, 95)), 4),
+        "p50_ms": round(float(np.percentile(candidate_ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(candidate_ms, 95)), 4),
+    }
@@ -0,0 +1,55 @@
+import json
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Headers that keep proxies (nginx in particular) from buffering the stream
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no',
+}
+
+
+def format_sse(event, data):
+    """Encode one server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def chat_event_stream(events, on_complete=None):
+    """
+    Relay chat bot events as server-sent events
+
+    Text chunks are collected as they are sent; once the bot is done the full
+    response is handed to `on_complete` (to persist it) and a final "done"
+    event carrying the whole response is sent. If generating or persisting
+    fails, an "error" event is sent instead of "done". If the client
+    disconnects early the generator is closed and nothing is persisted.
+
+    Args:
+        events (iterable): (event, data) tuples from SimpleChatBot.stream_reply
+        on_complete (callable): Called with the full response text
+
+    Yields:
+        str: Encoded events
+    """
+    parts = []
+    try:
+        for event, data in events:
+            if event == 'message':
+                parts.append(data['text'])
+            yield format_sse(event, data)
+        response = ''.join(parts)
+        # Persisting can fail too (e.g. Mongo down), after the text went out
+        if on_complete is not None:
+            on_complete(response)
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error(f"Chat stream failed: {e}")
+        yield format_sse('error', {'message': 'Failed to generate a response'})
+        return
+
+    yield format_sse('done', {
+        'response': response,
+        'timestamp': datetime.utcnow().isoformat()
+    })
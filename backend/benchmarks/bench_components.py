@@ -0,0 +1,93 @@
+"""
+Microbenchmarks of the per-request hot paths, so regressions show up as numbers.
+
+Times, with p50/p99 per call:
+  - get_career_recommendations, scored (cache cleared each call) and cached
+  - SimpleChatBot.get_response in keyword and tfidf modes
+  - bcrypt hash and verify at --rounds, inline and through PasswordHasher's
+    process pool (the path register and login take)
+
+    python -m benchmarks.bench_components --repeat 500 --rounds 12
+"""
+import argparse
+import json
+import tempfile
+import time
+
+from app.utils import career_utils
+from app.utils.career_utils import get_career_recommendations
+from app.utils.chat_bot import SimpleChatBot
+from app.utils.passwords import PasswordHasher, check_password, hash_password
+from benchmarks.load_api import MESSAGES, PROFILES
+from benchmarks.load_chat import percentile
+
+
+def timed(name, fn, repeat, **extra):
+    fn(0)
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    print(json.dumps(dict(
+        benchmark=name,
+        calls=repeat,
+        mean_us=round(sum(samples) / repeat * 1e6, 1),
+        p50_us=round(percentile(samples, 0.50) * 1e6, 1),
+        p99_us=round(percentile(samples, 0.99) * 1e6, 1),
+        **extra
+    )), flush=True)
+
+
+def bench_recommendations(repeat):
+    career_utils.get_career_index()
+
+    def scored(i):
+        career_utils._recommendation_cache.clear()
+        profile = PROFILES[i % len(PROFILES)]
+        get_career_recommendations(profile["skills"], profile["interests"])
+
+    def cached(i):
+        profile = PROFILES[i % len(PROFILES)]
+        get_career_recommendations(profile["skills"], profile["interests"])
+
+    timed("recommendations_scored", scored, repeat)
+    timed("recommendations_cached", cached, repeat)
+
+
+def bench_chat_bot(repeat):
+    for mode in SimpleChatBot.MODES:
+        bot = SimpleChatBot(mode=mode)
+        timed(f"chat_bot_{mode}", lambda i: bot.get_response(MESSAGES[i % len(MESSAGES)]), repeat)
+
+
+def bench_bcrypt(repeat, rounds):
+    password = b"benchmark-password"
+    hashed = hash_password(password, rounds)
+    timed("bcrypt_hash_inline", lambda i: hash_password(password, rounds), repeat, rounds=rounds)
+    timed("bcrypt_verify_inline", lambda i: check_password(password, hashed), repeat, rounds=rounds)
+
+    with tempfile.TemporaryDirectory() as slot_dir:
+        hasher = PasswordHasher(rounds=rounds, workers=1, max_concurrent=1, queue_timeout=60, slot_dir=slot_dir)
+        timed("bcrypt_hash_pool", lambda i: hasher.hash("benchmark-password"), repeat, rounds=rounds)
+        timed("bcrypt_verify_pool", lambda i: hasher.verify("benchmark-password", hashed), repeat, rounds=rounds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=500, help="Calls per recommender and chat benchmark")
+    parser.add_argument("--bcrypt-repeat", type=int, default=10, help="Calls per bcrypt benchmark")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt work factor")
+    parser.add_argument("--only", choices=["recommendations", "chat_bot", "bcrypt"])
+    args = parser.parse_args()
+
+    if args.only in (None, "recommendations"):
+        bench_recommendations(args.repeat)
+    if args.only in (None, "chat_bot"):
+        bench_chat_bot(args.repeat)
+    if args.only in (None, "bcrypt"):
+        bench_bcrypt(args.bcrypt_repeat, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
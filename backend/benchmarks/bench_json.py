@@ -0,0 +1,91 @@
+"""
+Serialization cost of API responses: per-route conversion vs the JSON provider.
+
+Encodes a chat history page (ObjectId and datetime fields) and a
+recommendation response (NumPy scores) the way routes used to (copy each
+document converting _id and timestamps, then Flask's default encoder) and
+through APIJSONProvider with the stdlib and, if installed, orjson backends:
+
+    python -m benchmarks.bench_json --messages 100 --repeat 2000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils import json_provider
+from app.utils.json_provider import APIJSONProvider
+
+
+def history_page(size):
+    now = datetime.utcnow()
+    return [{
+        "_id": ObjectId(),
+        "user_message": f"What should I study to become a data scientist? ({i})",
+        "bot_response": "Consider your strengths and passions when choosing a career path.",
+        "timestamp": now - timedelta(seconds=i),
+        "conversation_id": "default",
+    } for i in range(size)]
+
+
+def recommendations(size):
+    return [{
+        "career_title": f"Career {i}",
+        "skills": ["python", "statistics", "machine learning"],
+        "interests": ["research", "technology"],
+        "match_score": np.float64(0.8731 - i / 100) * 100,
+    } for i in range(size)]
+
+
+def per_route(provider, page, careers):
+    history = []
+    for record in page:
+        record = dict(record)
+        record["_id"] = str(record["_id"])
+        record["timestamp"] = record["timestamp"].isoformat()
+        history.append(record)
+    provider.dumps({"history": history}, separators=(",", ":"))
+    provider.dumps({"recommendations": careers}, separators=(",", ":"))
+
+
+def with_provider(provider, page, careers):
+    provider.dumps({"history": page}, separators=(",", ":"))
+    provider.dumps({"recommendations": careers}, separators=(",", ":"))
+
+
+def timed(fn, repeat, *args):
+    fn(*args)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return round((time.perf_counter() - start) / repeat * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--careers", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    page, careers = history_page(args.messages), recommendations(args.careers)
+    results = {"per_route_us": timed(per_route, args.repeat, DefaultJSONProvider(app), page, careers)}
+
+    orjson = json_provider.orjson
+    json_provider.orjson = None
+    results["provider_json_us"] = timed(with_provider, args.repeat, APIJSONProvider(app), page, careers)
+    json_provider.orjson = orjson
+    if orjson is not None:
+        results["provider_orjson_us"] = timed(with_provider, args.repeat, APIJSONProvider(app), page, careers)
+
+    print(json.dumps(dict(messages=args.messages, careers=args.careers, **results)))
+
+
+if __name__ == "__main__":
+    main()
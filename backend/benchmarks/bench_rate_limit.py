@@ -0,0 +1,75 @@
+"""
+Per-hit overhead and cross-process accuracy of the rate-limit storages.
+
+Times FixedWindowRateLimiter.hit() against each storage URI from one
+process, then has several processes hit one shared key and checks the
+final count (a per-process storage only sees its own hits):
+
+    python -m benchmarks.bench_rate_limit --hits 20000 --processes 4
+    python -m benchmarks.bench_rate_limit --uris memory:// mongodb://localhost:27017
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+# Registers the mmap:// scheme
+from app.utils import rate_limit_storage  # noqa: F401
+
+
+def time_hits(uri, hits, keys):
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    limit = parse("1000000 per hour")
+    start = time.perf_counter()
+    for i in range(hits):
+        limiter.hit(limit, "bench", str(i % keys))
+    elapsed = time.perf_counter() - start
+    return {"uri": uri, "hits": hits, "us_per_hit": round(elapsed / hits * 1e6, 2)}
+
+
+def _hit_shared_key(uri, hits):
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    limit = parse("1000000 per hour")
+    for _ in range(hits):
+        limiter.hit(limit, "bench", "shared")
+
+
+def shared_count(uri, processes, hits):
+    storage = storage_from_string(uri)
+    storage.reset()
+    workers = [
+        multiprocessing.Process(target=_hit_shared_key, args=(uri, hits))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    limiter = FixedWindowRateLimiter(storage)
+    window = limiter.get_window_stats(parse("1000000 per hour"), "bench", "shared")
+    counted = 1000000 - window.remaining
+    return {"uri": uri, "expected": processes * hits, "counted": counted}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    default_mmap = "mmap://" + os.path.join(tempfile.gettempdir(), "bench-ratelimit.mmap")
+    parser.add_argument("--uris", nargs="+", default=["memory://", default_mmap])
+    parser.add_argument("--hits", type=int, default=20000)
+    parser.add_argument("--keys", type=int, default=1000, help="Distinct clients hitting the limiter")
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    for uri in args.uris:
+        print(json.dumps(time_hits(uri, args.hits, args.keys)))
+        print(json.dumps(shared_count(uri, args.processes, args.hits // args.processes)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Recall@k and latency of the approximate similarity backend against exact search.
+
+Builds a synthetic catalog of job-title profiles by mixing survey rows from
+career_recommender.csv, then queries it with real survey profiles:
+
+    python -m benchmarks.bench_similarity --careers 20000 --queries 200 --k 5
+"""
+import argparse
+import json
+import random
+
+from app.config import Config
+from app.utils.career_index import CareerIndex
+from app.utils.career_loader import iter_survey_rows
+from app.utils.similarity import ExactBackend, IVFBackend, compare_backends
+
+
+def synthetic_catalog(rows, size, rng):
+    careers = []
+    for i in range(size):
+        mixed = rng.sample(rows, 3)
+        careers.append({
+            "career_title": f"Synthetic career {i}",
+            "skills": sorted({skill for row in mixed for skill in row["skills"]}),
+            "interests": sorted({interest for row in mixed for interest in row["interests"]}),
+            "description": "",
+        })
+    return careers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", default=Config.CAREER_DATA_CSV)
+    parser.add_argument("--careers", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--lists", type=int, default=0)
+    parser.add_argument("--probes", default="2,4,8,16")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = [row for row in iter_survey_rows(args.csv) if row["skills"] or row["interests"]]
+    index = CareerIndex(synthetic_catalog(rows, args.careers, rng))
+    queries = [" ".join(row["skills"] + row["interests"]) for row in rng.sample(rows, args.queries)]
+    user_matrix = index.transform(queries)
+    print(json.dumps({"index": index.stats()}))
+
+    exact = ExactBackend(index.matrix)
+    for n_probe in (int(p) for p in args.probes.split(",")):
+        ivf = IVFBackend(index.matrix, n_lists=args.lists, n_probe=n_probe, seed=args.seed)
+        report = compare_backends(exact, ivf, user_matrix, args.k)
+        report.update(ivf.stats())
+        print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
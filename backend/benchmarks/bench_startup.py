@@ -0,0 +1,114 @@
+"""
+Boot time and memory of a worker under the lazy-import and preload settings.
+
+Each scenario runs in a fresh interpreter: importing the app package,
+create_app() without and with the career index warm-up, and a preloaded
+master that forks workers which then serve one recommendation. Memory is
+read from /proc (Linux): RSS, and for forked workers the private (unshared)
+part, which is what each extra worker actually costs:
+
+    python -m benchmarks.bench_startup --workers 4
+
+Without a reachable MONGO_URI, create_app waits --mongo-timeout-ms for
+server selection; that wait is included in the boot times.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SCENARIOS = {
+    "import_app": """
+import app
+""",
+    "create_app": """
+from app import create_app
+create_app()
+""",
+    "create_app_warm": """
+from app import create_app
+create_app()
+""",
+}
+
+PRELOAD = """
+import gc, json, os
+from app import create_app
+from app.utils.career_utils import get_career_recommendations
+create_app()
+gc.freeze()
+children = []
+for _ in range({workers}):
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read)
+        get_career_recommendations(["python", "data analysis"], ["research"])
+        os.write(write, json.dumps(memory()).encode())
+        os._exit(0)
+    os.close(write)
+    children.append((pid, read))
+workers = []
+for pid, read in children:
+    workers.append(json.loads(os.read(read, 4096)))
+    os.waitpid(pid, 0)
+result["workers"] = workers
+"""
+
+HARNESS = """
+import sys, time
+start = time.perf_counter()
+
+def memory():
+    fields = {{}}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {{
+        "rss_mb": round(fields.get("Rss", 0) / 1024, 1),
+        "private_mb": round((fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024, 1),
+    }}
+
+result = {{}}
+{body}
+result["seconds"] = round(time.perf_counter() - start, 3)
+result.update(memory())
+result["loaded"] = sorted(m for m in ("numpy", "scipy", "sklearn", "pandas") if m in sys.modules)
+print("RESULT " + json.dumps(result))
+"""
+
+
+def run(name, body, env):
+    code = HARNESS.format(body="import json\n" + body)
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    line = next(line for line in output.splitlines() if line.startswith("RESULT "))
+    report = {"scenario": name}
+    report.update(json.loads(line[len("RESULT "):]))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mongo-timeout-ms", default="200")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("MONGO_SERVER_SELECTION_TIMEOUT_MS", args.mongo_timeout_ms)
+    env["CHAT_WRITE_BEHIND"] = "False"
+
+    for name, body in SCENARIOS.items():
+        env["CAREER_INDEX_WARMUP"] = "True" if name == "create_app_warm" else "False"
+        print(json.dumps(run(name, body, env)))
+
+    env["CAREER_INDEX_WARMUP"] = "True"
+    print(json.dumps(run("preload_fork", PRELOAD.format(workers=args.workers), env)))
+
+
+if __name__ == "__main__":
+    main()
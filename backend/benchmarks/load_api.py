@@ -0,0 +1,255 @@
+"""
+Reproducible load test of the whole API, without a deployment.
+
+Boots create_app in this process against mongomock (pip install mongomock;
+serialized behind one lock since it is not thread-safe) or, with
+--mongo-uri, a local mongod, and drives it through the Flask test
+client from one thread per simulated user. Each user registers, logs in and
+then loops over a weighted mix of chat, history, recommendation and login
+requests. For every concurrency level one JSON line reports throughput and
+p50/p95/p99 latency per operation and overall:
+
+    python -m benchmarks.load_api --levels 1,8,32 --duration 10
+    python -m benchmarks.load_api --mongo-uri mongodb://localhost:27017/pathpilot_bench
+
+Requests share this process's GIL, so the numbers track per-request cost
+and lock contention across releases; to measure a real server's concurrency
+run benchmarks.load_chat against gunicorn. BCRYPT_ROUNDS and the AUTH_*
+settings apply as configured, so register and login include the real
+hashing cost and may be rejected with 503 when sign-ins pile up.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from unittest import mock
+
+from app import create_app
+from app.config import Config
+from app.utils.database import Database
+from benchmarks.load_chat import percentile
+
+MESSAGES = [
+    "Hello, I need career advice",
+    "What skills should I learn for software engineering?",
+    "Do I need a degree to become a data scientist?",
+    "How do I find a job in healthcare?",
+    "I like python and data analysis, what careers fit me?",
+]
+
+PROFILES = [
+    {"skills": ["python", "statistics"], "interests": ["data", "research"]},
+    {"skills": ["drawing", "design"], "interests": ["art", "technology"]},
+    {"skills": ["communication", "teaching"], "interests": ["education"]},
+    {"skills": ["accounting", "excel"], "interests": ["finance", "business"]},
+]
+
+
+class _Locked:
+    """
+    Runs every call on a mongomock object under one lock.
+
+    mongomock is not thread-safe: a find iterating a collection while another
+    thread inserts fails with "dictionary changed size during iteration",
+    which would surface as failed history requests. Cursors returned by
+    calls are wrapped too and read in full under the lock.
+    """
+
+    def __init__(self, target, lock):
+        self._target = target
+        self._lock = lock
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with self._lock:
+                result = attr(*args, **kwargs)
+            if hasattr(result, '__next__'):
+                return _Locked(result, self._lock)
+            return result
+        return call
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._target))
+
+
+class MongomockDatabase(Database):
+    """Database backed by an in-memory mongomock client shared by all threads"""
+
+    _mongomock_lock = threading.RLock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            import mongomock
+            self._client = mongomock.MongoClient()
+            self._db = self._client['pathpilot_bench']
+        return self._client
+
+    def test_connection(self):
+        return True
+
+    def get_collection(self, name):
+        # Every store and model reaches Mongo through here
+        return _Locked(super().get_collection(name), self._mongomock_lock)
+
+
+def build_app(mongo_uri):
+    class BenchConfig(Config):
+        MONGO_URI = mongo_uri or Config.MONGO_URI
+        # Every simulated user shares one client address
+        RATELIMIT_ENABLED = False
+
+    if mongo_uri:
+        app = create_app(BenchConfig)
+    else:
+        with mock.patch('app.Database', MongomockDatabase):
+            app = create_app(BenchConfig)
+    if app.database is None:
+        raise SystemExit("Could not connect to MongoDB")
+    return app
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, weight = part.split("=")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+class SimulatedUser:
+    """One user's session against the test client, recording each request"""
+
+    def __init__(self, app, record, rng):
+        self.client = app.test_client()
+        self.record = record
+        self.rng = rng
+        self.email = f"load-{uuid.uuid4().hex}@example.com"
+        self.password = "load-test-password"
+        self.headers = None
+
+    def call(self, operation, method, path, **kwargs):
+        start = time.perf_counter()
+        response = self.client.open(path, method=method, headers=self.headers, **kwargs)
+        self.record(operation, time.perf_counter() - start, response.status_code)
+        return response
+
+    def sign_in(self, operation, path, body, deadline):
+        # Retried while the host-wide auth limit rejects it, like a real client would
+        while time.perf_counter() < deadline:
+            response = self.call(operation, 'POST', path, json=body)
+            if response.status_code in (200, 201):
+                self.headers = {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+                return True
+            if response.status_code != 503:
+                return False
+            time.sleep(float(response.headers.get('Retry-After', 1)))
+        return False
+
+    def register(self, deadline):
+        body = {"email": self.email, "password": self.password, "name": "Load test"}
+        return self.sign_in('register', '/api/auth/register', body, deadline)
+
+    def login(self, deadline):
+        body = {"email": self.email, "password": self.password}
+        return self.sign_in('login', '/api/auth/login', body, deadline)
+
+    def chat(self):
+        self.call('chat', 'POST', '/api/chat', json={"message": self.rng.choice(MESSAGES)})
+
+    def history(self):
+        self.call('history', 'GET', '/api/chat/history?limit=20')
+
+    def recommendations(self):
+        self.call('recommendations', 'POST', '/api/career-recommendations', json=self.rng.choice(PROFILES))
+
+    def run(self, deadline, mix):
+        if not self.register(deadline) or not self.login(deadline):
+            return
+        operations, weights = list(mix), list(mix.values())
+        while time.perf_counter() < deadline:
+            operation = self.rng.choices(operations, weights)[0]
+            if operation == 'login':
+                self.login(deadline)
+            else:
+                getattr(self, operation)()
+
+
+def summarize(latencies, statuses, elapsed):
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "statuses": {str(status): count for status, count in statuses.items()},
+    }
+
+
+def run_level(app, users, duration, mix, seed):
+    latencies, statuses = defaultdict(list), defaultdict(Counter)
+    lock = threading.Lock()
+
+    def record(operation, seconds, status):
+        with lock:
+            latencies[operation].append(seconds)
+            statuses[operation][status] += 1
+
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=SimulatedUser(app, record, random.Random(seed + i)).run, args=(deadline, mix))
+        for i in range(users)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total_statuses = Counter()
+    for counter in statuses.values():
+        total_statuses.update(counter)
+    return {
+        "concurrency": users,
+        "duration_s": round(elapsed, 2),
+        "total": summarize([s for values in latencies.values() for s in values], total_statuses, elapsed),
+        "operations": {
+            operation: summarize(latencies[operation], statuses[operation], elapsed)
+            for operation in sorted(latencies)
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mongo-uri", default=None, help="Local mongod to use instead of mongomock")
+    parser.add_argument("--levels", default="1,8,32")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--mix", default="chat=5,history=2,recommendations=2,login=1",
+                        help="Relative weights of chat, history, recommendations and login")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    unknown = set(mix) - {"chat", "history", "recommendations", "login"}
+    if unknown:
+        parser.error(f"Unknown operations in --mix: {', '.join(sorted(unknown))}")
+
+    app = build_app(args.mongo_uri)
+    for users in (int(level) for level in args.levels.split(",")):
+        print(json.dumps(run_level(app, users, args.duration, mix, args.seed)), flush=True)
+    if app.chat_writer:
+        app.chat_writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Closed-loop load test of the chat endpoints at increasing concurrency.
+
+Each simulated user registers once, then loops: POST /api/chat, and every
+--history-every requests GET /api/chat/history. For each concurrency level
+the throughput, latency percentiles and error counts are reported, so sync
+and gevent workers can be compared at equal p99:
+
+    GUNICORN_WORKER_CLASS=gevent WEB_CONCURRENCY=1 RATELIMIT_ENABLED=False \\
+        gunicorn -c gunicorn.conf.py run:app
+    python -m benchmarks.load_chat --url http://localhost:5000 --levels 4,16,64,256
+
+Rate limiting must be off on the server (RATELIMIT_ENABLED=False) since
+every simulated user shares one client address.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+
+import requests
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def register(url):
+    email = f"load-{uuid.uuid4().hex}@example.com"
+    response = requests.post(f"{url}/api/auth/register", json={
+        "email": email, "password": "load-test-password", "name": "Load test"
+    }, timeout=30)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def user_loop(url, headers, deadline, history_every, latencies, statuses, lock):
+    session = requests.Session()
+    session.headers.update(headers)
+    i = 0
+    while time.perf_counter() < deadline:
+        i += 1
+        start = time.perf_counter()
+        try:
+            if i % history_every == 0:
+                response = session.get(f"{url}/api/chat/history", timeout=30)
+            else:
+                response = session.post(f"{url}/api/chat", json={
+                    "message": "What careers fit python and data analysis skills?"
+                }, timeout=30)
+            status = response.status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] += 1
+
+
+def run_level(url, users, duration, history_every):
+    headers = [register(url) for _ in range(users)]
+    latencies, statuses, lock = [], Counter(), threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=user_loop, args=(url, h, deadline, history_every, latencies, statuses, lock))
+        for h in headers
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": users,
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "statuses": {str(status): count for status, count in statuses.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--levels", default="4,16,64")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--history-every", type=int, default=5)
+    args = parser.parse_args()
+
+    for users in (int(level) for level in args.levels.split(",")):
+        print(json.dumps(run_level(args.url.rstrip("/"), users, args.duration, args.history_every)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Gunicorn settings; every value can be overridden from the environment
+#   gunicorn -c gunicorn.conf.py run:app
+import gc
+import os
+import shlex
+import sys
+import threading
+
+
+def _command_line(name, default):
+    # GUNICORN_CMD_ARGS and then the command line (e.g. -k/--worker-class)
+    # take precedence over this file, but are applied only after it has run
+    from gunicorn.config import Config as GunicornConfig
+
+    parser = GunicornConfig().parser()
+    value = default
+    for argv in (shlex.split(os.getenv("GUNICORN_CMD_ARGS", "")), sys.argv[1:]):
+        try:
+            args, _ = parser.parse_known_args(argv)
+        except SystemExit:  # Not started by the gunicorn CLI
+            continue
+        value = getattr(args, name, None) or value
+    return value
+
+
+# "sync" serves one request per worker at a time and is the supported mode.
+# "gevent" lets pymongo, the chat writer and SSE streams yield while they
+# wait on sockets, so one worker keeps up to worker_connections requests in
+# flight with the same route code. It raises throughput and p50, but has not
+# yet measured a p99 no worse than sync (see benchmarks.load_chat), so do not
+# switch to it without comparing both on the target host.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+gevent = "gevent" in _command_line("worker_class", worker_class)
+if gevent:
+    # Must run before the preloaded app imports pymongo, threading or ssl,
+    # whether gevent was chosen here, in GUNICORN_CMD_ARGS or with -k
+    from gevent import monkey
+    monkey.patch_all()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+# WEB_CONCURRENCY is also what Heroku sizes per dyno
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "100" if gevent else "1000"))
+if gevent:
+    # Every request in flight may need a Mongo connection at once; with a
+    # smaller pool they queue for one inside the worker, which is where the
+    # p99 went at the default of 20. Config reads this when the app loads
+    os.environ.setdefault(
+        "MONGO_MAX_POOL_SIZE", str(_command_line("worker_connections", worker_connections))
+    )
+
+# Build the app (and the career index, see CAREER_INDEX_WARMUP) once in the
+# master so workers share those pages copy-on-write instead of each loading
+# them. Safe because Mongo clients, chat writer threads and hashing pools
+# are all created lazily in each worker.
+preload_app = os.getenv("GUNICORN_PRELOAD", "True").lower() == "true"
+
+
+def on_starting(server):
+    # Snapshots of a previous run's workers would be added to this run's totals
+    from app.config import Config
+    from app.utils.metrics import clear_snapshots
+    clear_snapshots(Config.METRICS_DIR)
+
+
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        # create_app checked the database from the master; close that client
+        # so its monitor threads are not inherited half-alive by the worker,
+        # which opens its own on first use
+        database = getattr(server.app.wsgi(), "database", None)
+        if database is not None:
+            database.close()
+            for thread in threading.enumerate():
+                if thread.name.startswith("pymongo"):
+                    thread.join(timeout=1)
+    # Move everything allocated so far out of the collector's reach so
+    # collections in the workers do not touch (and copy) the shared pages
+    gc.freeze()
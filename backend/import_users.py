@@ -0,0 +1,144 @@
+import argparse
+import csv
+import json
+import os
+import time
+from collections import Counter
+from itertools import islice
+from multiprocessing import Pool
+from pymongo.errors import BulkWriteError
+from app.models.user import User
+from app.utils.database import Database
+from app.utils.passwords import hash_password
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+def read_users(path):
+    """
+    Yield user rows (email, name, password or password_hash) from a CSV or NDJSON file
+
+    Unparseable NDJSON lines are yielded as None, for the caller to count as invalid.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        yield None
+
+def _row_problem(row):
+    """Why a row cannot be imported, or None if it can"""
+    if not isinstance(row, dict):
+        return "not a JSON object"
+    email = row.get('email')
+    if not isinstance(email, str) or '@' not in email:
+        return "missing or invalid email"
+    if row.get('password_hash'):
+        # Only bcrypt hashes can be verified at login
+        if not isinstance(row['password_hash'], str) or not row['password_hash'].startswith('$2'):
+            return "password_hash is not a bcrypt hash"
+    elif not isinstance(row.get('password'), str) or not row['password']:
+        return "missing password"
+    if not isinstance(row.get('name') or '', str):
+        return "invalid name"
+    return None
+
+def _valid_rows(rows, counts):
+    """Yield the importable rows, logging and counting the others in counts['invalid']"""
+    for number, row in enumerate(rows, 1):
+        problem = _row_problem(row)
+        if problem:
+            logger.warning(f"Skipping row {number}: {problem}")
+            counts['invalid'] += 1
+        else:
+            yield row
+
+def _to_document(row, rounds):
+    # Runs in the hashing pool; pre-hashed rows (bcrypt, from another system) are kept as-is
+    if row.get('password_hash'):
+        hashed = row['password_hash'].encode('utf-8')
+    else:
+        hashed = hash_password(row['password'].encode('utf-8'), rounds)
+    return User.new_document(row['email'].strip(), hashed, row.get('name') or '')
+
+def _to_document_star(args):
+    return _to_document(*args)
+
+def _insert_batch(users, batch, counts):
+    """Insert one batch of documents, counting duplicates of existing users as skipped"""
+    try:
+        counts['inserted'] += len(users.insert_many(batch, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        errors = e.details.get('writeErrors', [])
+        duplicates = sum(1 for error in errors if error['code'] == DUPLICATE_KEY)
+        counts['inserted'] += e.details.get('nInserted', 0)
+        counts['skipped'] += duplicates
+        counts['failed'] += len(errors) - duplicates
+
+def import_users(path, batch_size=5000, rounds=12, processes=None):
+    mongo_uri = os.getenv("MONGO_URI")
+    if not mongo_uri:
+        logger.error("MONGO_URI environment variable not set.")
+        return
+
+    db_instance = None
+    try:
+        db_instance = Database(mongo_uri)
+        if not db_instance.test_connection():
+            logger.error("Could not connect to the database.")
+            return
+        # The unique email index turns re-imported users into skipped rows
+        db_instance.init_collections()
+        users = db_instance.get_collection("users")
+
+        counts = Counter()
+        rows = _valid_rows(read_users(path), counts)
+        start = time.perf_counter()
+        # Hashing dominates for plain-text passwords, so spread it over every
+        # core. The next batch is hashed while the current one is inserted;
+        # pool.imap over the whole file would instead queue every row up front
+        # and hold all finished documents until Mongo caught up
+        with Pool(processes) as pool:
+            hashing = None
+            while True:
+                chunk = [(row, rounds) for row in islice(rows, batch_size)]
+                next_hashing = pool.map_async(_to_document_star, chunk, chunksize=64) if chunk else None
+                if hashing is not None:
+                    _insert_batch(users, hashing.get(), counts)
+                    elapsed = time.perf_counter() - start
+                    processed = counts['inserted'] + counts['skipped'] + counts['failed']
+                    logger.info(f"Processed {processed} users ({processed / elapsed:.0f} rows/sec)")
+                if next_hashing is None:
+                    break
+                hashing = next_hashing
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Imported {counts['inserted']} users, skipped {counts['skipped']} existing, "
+                    f"{counts['invalid']} invalid, {counts['failed']} failed in {elapsed:.1f}s")
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+    finally:
+        if db_instance:
+            db_instance.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import users from a CSV or NDJSON file")
+    parser.add_argument("path", help="Rows with email, name and password or password_hash")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=int(os.getenv("BCRYPT_ROUNDS", "12")),
+                        help="bcrypt cost for plain-text passwords")
+    parser.add_argument("--processes", type=int, default=None, help="Hashing processes (default: all cores)")
+    args = parser.parse_args()
+
+    logger.info("Starting user import...")
+    import_users(args.path, args.batch_size, args.rounds, args.processes)
+    logger.info("Script finished.")
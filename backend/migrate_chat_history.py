@@ -0,0 +1,96 @@
+import argparse
+import os
+import time
+from app.utils.database import Database
+from app.utils.chat_store import BucketChatStore
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def migrate_chat_history(batch_size=1000, bucket_size=100, delete_migrated=False):
+    """
+    Copy per-message chat_history documents into per-conversation buckets
+
+    Safe to run again after an interruption: messages whose _id is already
+    in a bucket are skipped.
+    """
+    mongo_uri = os.getenv("MONGO_URI")
+    if not mongo_uri:
+        logger.error("MONGO_URI environment variable not set.")
+        return
+
+    db_instance = None
+    try:
+        db_instance = Database(mongo_uri)
+        if not db_instance.test_connection():
+            logger.error("Could not connect to the database.")
+            return
+
+        source = db_instance.get_collection("chat_history")
+        store = BucketChatStore(db_instance, bucket_size=bucket_size)
+
+        # Oldest first per user so buckets fill in conversation order; the exact
+        # reverse of the (user_id 1, timestamp -1, _id -1) index, so Mongo walks
+        # the index instead of sorting the whole collection in memory
+        cursor = source.find() \
+            .sort([("user_id", -1), ("timestamp", 1), ("_id", 1)]) \
+            .batch_size(batch_size)
+        migrated = 0
+        start = time.perf_counter()
+        batch = []
+        for record in cursor:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                migrated += _migrate_batch(source, store, batch, delete_migrated)
+                batch = []
+                elapsed = time.perf_counter() - start
+                logger.info(f"Migrated {migrated} messages ({migrated / elapsed:.0f} rows/sec)")
+        if batch:
+            migrated += _migrate_batch(source, store, batch, delete_migrated)
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Migrated {migrated} messages into buckets in {elapsed:.1f}s")
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+    finally:
+        if db_instance:
+            db_instance.close()
+
+def _already_migrated(store, batch):
+    """_ids of batch messages a previous, interrupted run already wrote to buckets"""
+    # A bucket ending before the batch's oldest message cannot hold any of it,
+    # which keeps the lookup on the (user_id, end) index
+    ids = {record["_id"] for record in batch}
+    stored = store.collection.distinct("messages._id", {
+        "user_id": {"$in": list({record["user_id"] for record in batch})},
+        "end": {"$gte": min(record["timestamp"] for record in batch)},
+        "messages._id": {"$in": list(ids)},
+    })
+    # distinct returns every _id of the matching buckets, not only the batch's
+    return ids.intersection(stored)
+
+def _migrate_batch(source, store, batch, delete_migrated):
+    existing = _already_migrated(store, batch)
+    pending = [record for record in batch if record["_id"] not in existing]
+    if existing:
+        logger.info(f"Skipping {len(existing)} messages migrated by an earlier run")
+    written = store.append_many(pending) if pending else 0
+    if written != len(pending):
+        raise RuntimeError(f"Only {written} of {len(pending)} messages were written, stopping")
+    if delete_migrated:
+        source.delete_many({"_id": {"$in": [record["_id"] for record in batch]}})
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move chat history into the bucketed layout")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--bucket-size", type=int, default=int(os.getenv("CHAT_BUCKET_SIZE", "100")))
+    parser.add_argument("--delete-migrated", action="store_true",
+                        help="Delete source messages once their batch is written")
+    args = parser.parse_args()
+
+    logger.info("Starting chat history migration...")
+    migrate_chat_history(args.batch_size, args.bucket_size, args.delete_migrated)
+    logger.info("Script finished.")
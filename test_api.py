@@ -22,7 +22,7 @@ def test_user_registration():
     print("\n=== Testing User Registration ===")
     try:
         data = {
-            "username": "testuser",
+            "name": "testuser",
             "email": "test@example.com",
             "password": "testpassword123"
         }
@@ -46,7 +46,7 @@ def test_user_login():
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         if response.status_code == 200:
-            token = response.json().get('token')
+            token = response.json().get('access_token')
             return token
         return None
     except Exception as e:
@@ -79,7 +79,7 @@ def test_career_recommendations(token):
             "skills": ["Python", "JavaScript"],
             "experience": "beginner"
         }
-        response = requests.post(f"{BASE_URL}/career/recommendations", json=data, headers=headers)
+        response = requests.post(f"{BASE_URL}/career-recommendations", json=data, headers=headers)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         return response.status_code == 200
@@ -92,7 +92,7 @@ def test_protected_endpoint(token):
     print("\n=== Testing Protected Endpoint ===")
     try:
         headers = {"Authorization": f"Bearer {token}"}
-        response = requests.get(f"{BASE_URL}/user/profile", headers=headers)
+        response = requests.get(f"{BASE_URL}/auth/me", headers=headers)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         return response.status_code == 200